@@ -0,0 +1,424 @@
+import gc
+import ctypes
+import time
+import trivial as gl
+import numpy as np
+from OpenGL import GL
+from quickwindow import quick_window
+
+VERTEX_SHADER = """
+#version 330
+in vec3 position;
+uniform mat4 modelview;
+void main() {
+    gl_Position = modelview * vec4(position, 1.0);
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 330
+uniform vec4 color;
+out vec4 out_color;
+void main() {
+    out_color = color;
+}
+"""
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+def create_scene(count, shared=False):
+    program = gl.Program(shaders=[gl.VertexShader(VERTEX_SHADER), gl.FragmentShader(FRAGMENT_SHADER)])
+    pipeline = gl.Pipeline(program)
+    data, indices = gl.create_cube()
+    vbo = gl.VertexBuffer(data=data.astype(np.float32))
+    ibo = gl.IndexBuffer(data=indices)
+    meshes = [gl.Mesh(pipeline, indices=ibo, shared=shared, position=vbo.pointers[0]) for _ in range(count)]
+    return pipeline, meshes
+
+def bench_bindings(count=5000, frames=3):
+    _, meshes = create_scene(count)
+    modelview = np.eye(4, dtype=np.float32)
+    color = np.ones(4, dtype=np.float32)
+
+    def frame():
+        for mesh in meshes:
+            mesh.draw(modelview=modelview, color=color)
+        GL.glFinish()
+
+    state = gl.binding_state()
+    for retain in (False, True):
+        state.reset_stats()
+        elapsed = 0.0
+        for _ in range(frames):
+            if retain:
+                with state.retain_bindings():
+                    elapsed += timed(frame)[0]
+            else:
+                elapsed += timed(frame)[0]
+        print('bindings retain={}: {} draws/frame, {:.2f} ms/frame, issued {issued}, elided {elided}'.format(
+            retain, count, elapsed / frames * 1000., **state.stats))
+
+def bench_dispatch(count=100000):
+    buffer = gl.VertexBuffer(data=np.zeros((3, 3), dtype=np.float32))
+    handle = buffer.handle
+
+    def reflective_bind(obj, handle):
+        # per call argument introspection, as BindableObject used to do
+        func = obj._bind_func
+        if hasattr(obj._bind_func, 'wrappedOperation'):
+            func = obj._bind_func.wrappedOperation
+        if len(func.argNames) == 2:
+            obj._bind_func(obj._target, handle)
+        else:
+            obj._bind_func(handle)
+
+    def reflective():
+        for _ in range(count):
+            reflective_bind(buffer, handle)
+
+    def precomputed():
+        bind = buffer._bind_call
+        for _ in range(count):
+            bind(handle)
+
+    before = timed(reflective)[0]
+    after = timed(precomputed)[0]
+    print('dispatch: reflective {:.0f} binds/s, precomputed {:.0f} binds/s'.format(
+        count / before, count / after))
+
+def bench_teardown(count=20000):
+    queue = gl.deletion_queue()
+    queue.flush()
+    queue.reset_stats()
+    # buffers are recycled by their pool, vertex arrays are deleted
+    vertex_arrays = [gl.VertexArray() for _ in range(count)]
+    del vertex_arrays
+    gc.collect()
+    elapsed = timed(queue.flush)[0]
+    print('teardown: {deleted} objects, {calls} glDelete* calls, {:.2f} ms'.format(
+        elapsed * 1000., **queue.stats))
+
+def bench_create(count=100000):
+    data = np.zeros((3, 3), dtype=np.float32)
+
+    def create():
+        buffers = [gl.VertexBuffer(data=data) for _ in range(count)]
+        GL.glFinish()
+        return buffers
+
+    for pooled in (False, True):
+        gl.Buffer._pooled = pooled
+        elapsed, buffers = timed(create)
+        del buffers
+        gc.collect()
+        gl.deletion_queue().flush()
+        print('create pooled={}: {} buffers, {:.0f} ms'.format(pooled, count, elapsed * 1000.))
+    gl.Buffer._pooled = True
+
+    key = (gl.Buffer._dsa_create_func,) if gl.direct_state_access() else (gl.Buffer._create_func,)
+    print('create pool: {allocated} allocated in {batches} batches, {acquired} acquired, {reused} reused'.format(
+        **gl.handle_pool(key).stats))
+
+def bench_stream(nbytes=4 * 1024 * 1024, frames=200):
+    count = nbytes // 4
+    buffer = gl.VertexBuffer(shape=(count,), dtype=np.float32, usage=GL.GL_STREAM_DRAW)
+    frame_data = np.ones(count, dtype=np.float32)
+
+    def copied():
+        # map into a private copy, which must then be uploaded
+        for _ in range(frames):
+            with buffer:
+                ptr = GL.glMapBuffer(buffer.target, GL.GL_READ_WRITE)
+            data = np.frombuffer((ctypes.c_ubyte * nbytes).from_address(ptr), dtype=np.float32).copy()
+            with buffer:
+                GL.glUnmapBuffer(buffer.target)
+            data[:] = frame_data
+            buffer.set_data(data)
+        GL.glFinish()
+
+    def zero_copy():
+        for _ in range(frames):
+            with buffer.map(GL.GL_WRITE_ONLY, flags=GL.GL_MAP_INVALIDATE_BUFFER_BIT) as data:
+                data[:] = frame_data
+        GL.glFinish()
+
+    before = timed(copied)[0]
+    after = timed(zero_copy)[0]
+    print('stream: {} KiB/frame, copy {:.2f} ms/frame, zero copy {:.2f} ms/frame'.format(
+        nbytes // 1024, before / frames * 1000., after / frames * 1000.))
+
+def bench_swap(count=10000, swaps=4):
+    # every mesh owns its vertex array, shared ones don't rebind at all
+    pipeline, meshes = create_scene(count, shared=False)
+    other = gl.Pipeline(gl.Program(shaders=[gl.VertexShader(VERTEX_SHADER), gl.FragmentShader(FRAGMENT_SHADER)]))
+    pipelines = [other, pipeline]
+
+    def full():
+        # the previous behaviour, every attribute disabled and re-enabled
+        for swap in range(swaps):
+            for mesh in meshes:
+                mesh.vertex_array.clear()
+                mesh.pipeline = pipelines[swap % 2]
+
+    def incremental():
+        for swap in range(swaps):
+            for mesh in meshes:
+                mesh.pipeline = pipelines[swap % 2]
+
+    before = timed(full)[0]
+    after = timed(incremental)[0]
+    print('swap: {} meshes, full rebind {:.2f} ms/swap, incremental {:.2f} ms/swap'.format(
+        count, before / swaps * 1000., after / swaps * 1000.))
+
+def bench_indirect(count=10000, frames=10):
+    program = gl.Program(shaders=[gl.VertexShader(VERTEX_SHADER), gl.FragmentShader(FRAGMENT_SHADER)])
+    data, indices = gl.create_cube()
+    vertices = gl.VertexArena((count * len(data), 3), np.float32)
+    arena = gl.IndexArena(count * len(indices))
+    views = [arena.allocate(indices, vertices=vertices.allocate(data)) for _ in range(count)]
+    commands = gl.DrawIndirectBuffer(data=gl.commands_for_indices(views))
+    vertex_array = gl.VertexArray()
+    vertex_array[program.attributes['position'].location] = vertices.pointers[0]
+
+    def loop():
+        for _ in range(frames):
+            with program:
+                for view in views:
+                    vertex_array.render_indices(view)
+        GL.glFinish()
+
+    def indirect():
+        for _ in range(frames):
+            with program:
+                vertex_array.render_indirect(commands, arena.buffer)
+        GL.glFinish()
+
+    before = timed(loop)[0]
+    after = timed(indirect)[0]
+    print('indirect: {} draws/frame, loop {:.2f} ms/frame, multi draw indirect {:.2f} ms/frame'.format(
+        count, before / frames * 1000., after / frames * 1000.))
+
+def bench_upload(shape=(3840, 2160, 4), frames=60):
+    texture = gl.Texture2D(shape=shape, dtype=np.uint8, mipmap=False)
+    frame = np.random.randint(0, 255, size=shape, dtype=np.uint8)
+    uploader = gl.TextureUploader(frame.nbytes)
+
+    def direct():
+        for _ in range(frames):
+            texture.set_data(frame)
+        GL.glFinish()
+
+    def ring():
+        for _ in range(frames):
+            uploader.upload(texture, frame)
+        GL.glFinish()
+
+    before = timed(direct)[0]
+    after = timed(ring)[0]
+    print('upload: {}x{}, set_data {:.2f} ms/frame, unpack ring {:.2f} ms/frame, {} stalls'.format(
+        shape[0], shape[1], before / frames * 1000., after / frames * 1000., uploader.stalls))
+
+def bench_vertex_array_cache(count=5000, frames=3):
+    cache = gl.vertex_array_cache()
+    state = gl.binding_state()
+    color = np.ones(4, dtype=np.float32)
+    modelview = np.eye(4, dtype=np.float32)
+
+    def create(shared):
+        before = len(cache)
+        _, meshes = create_scene(count, shared=shared)
+        return meshes, len(cache) - before
+
+    def draw(meshes):
+        state.reset_stats()
+        with state.retain_bindings():
+            for _ in range(frames):
+                for mesh in meshes:
+                    mesh.draw(modelview=modelview, color=color)
+            GL.glFinish()
+        return state.issued
+
+    create_before, (owned, _) = timed(create, False)
+    create_after, (shared, vertex_arrays) = timed(create, True)
+    before, issued_before = timed(draw, owned)
+    after, issued_after = timed(draw, shared)
+    print('vertex array cache: {} meshes, {} vertex arrays owned vs {} shared, create {:.2f} vs {:.2f} ms'.format(
+        count, count, vertex_arrays, create_before * 1000., create_after * 1000.))
+    print('vertex array cache: draw {:.2f} vs {:.2f} ms/frame, {} vs {} binds issued'.format(
+        before / frames * 1000., after / frames * 1000., issued_before, issued_after))
+
+COMPACT_VERTEX_SHADER = """
+#version 330
+in vec3 position;
+in vec3 normal;
+in vec2 uv;
+out vec4 shade;
+void main() {
+    shade = vec4(normal * 0.5 + 0.5, uv.x);
+    gl_Position = vec4(position, 1.0);
+}
+"""
+
+COMPACT_FRAGMENT_SHADER = """
+#version 330
+in vec4 shade;
+out vec4 out_color;
+void main() {
+    out_color = shade;
+}
+"""
+
+def bench_compaction(count=3000000, frames=20):
+    vertex = np.dtype([('position', np.float32, 3), ('normal', np.float32, 3), ('uv', np.float32, 2)])
+    data = np.zeros(count, dtype=vertex)
+    data['position'] = np.random.uniform(-1., 1., (count, 3))
+    normals = np.random.uniform(-1., 1., (count, 3))
+    data['normal'] = normals / np.linalg.norm(normals, axis=1)[:, None]
+    data['uv'] = np.random.uniform(0., 1., (count, 2))
+    compact, errors = gl.compact_vertices(data)
+
+    program = gl.Program(shaders=[gl.VertexShader(COMPACT_VERTEX_SHADER), gl.FragmentShader(COMPACT_FRAGMENT_SHADER)])
+    pipeline = gl.Pipeline(program)
+    meshes = [gl.Mesh(pipeline, primitive=GL.GL_POINTS, **gl.VertexBuffer(data=vertices).pointers)
+              for vertices in (data, compact)]
+
+    def draw(mesh):
+        for _ in range(frames):
+            mesh.draw()
+        GL.glFinish()
+
+    before = timed(draw, meshes[0])[0]
+    after = timed(draw, meshes[1])[0]
+    print('compaction: {} vertices, {} -> {} bytes/vertex, float {:.2f} ms/frame, compact {:.2f} ms/frame'.format(
+        count, data.dtype.itemsize, compact.dtype.itemsize, before / frames * 1000., after / frames * 1000.))
+    print('compaction: max error {}'.format(', '.join('{} {:.2g}'.format(*item) for item in errors.items())))
+
+def bench_render_queue(count=5000, programs=4, frames=3):
+    # meshes of several programs, submitted interleaved at random depths
+    scenes = [create_scene(count // programs, shared=True) for _ in range(programs)]
+    meshes = [mesh for group in zip(*(meshes for _, meshes in scenes)) for mesh in group]
+    depths = np.random.uniform(0., 100., len(meshes))
+    modelview = np.eye(4, dtype=np.float32)
+    color = np.ones(4, dtype=np.float32)
+    queue = gl.RenderQueue()
+
+    def immediate():
+        for _ in range(frames):
+            for mesh in meshes:
+                mesh.draw(modelview=modelview, color=color)
+        GL.glFinish()
+
+    def queued():
+        for _ in range(frames):
+            for mesh, depth in zip(meshes, depths):
+                queue.submit(mesh, depth=depth, modelview=modelview, color=color)
+            queue.execute()
+        GL.glFinish()
+
+    before = timed(immediate)[0]
+    after = timed(queued)[0]
+    sort = timed(gl.radix_argsort, np.random.randint(0, 2 ** 63, len(meshes), dtype=np.uint64))[0]
+    print('render queue: {} draws/frame, immediate {:.2f} ms/frame, sorted {:.2f} ms/frame, radix sort {:.2f} ms'.format(
+        len(meshes), before / frames * 1000., after / frames * 1000., sort * 1000.))
+    print('render queue: {program_switches} program, {texture_switches} texture, {vertex_array_switches} vertex array switches/frame'.format(
+        **queue.stats))
+
+PARTICLE_VERTEX_SHADER = """
+#version 330
+in vec4 state;
+uniform float dt;
+out vec4 next_state;
+void main() {
+    // bounce between -1 and 1
+    vec2 position = state.xy + state.zw * dt;
+    vec2 velocity = mix(state.zw, -state.zw, vec2(greaterThan(abs(position), vec2(1.0))));
+    next_state = vec4(position, velocity);
+}
+"""
+
+def bench_feedback(count=1000000, frames=20, dt=0.01):
+    # particles advanced on the cpu and uploaded, or with transform feedback
+    state = np.random.uniform(-1., 1., (count, 4)).astype(np.float32)
+    cpu = gl.VertexBuffer(data=state, usage=GL.GL_STREAM_DRAW)
+    particles = gl.PingPongBuffers(data=state)
+    program = gl.Program(shaders=[gl.VertexShader(PARTICLE_VERTEX_SHADER)], varyings=['next_state'])
+    pipeline = gl.Pipeline(program)
+    meshes = dict((buffer, gl.Mesh(pipeline, primitive=GL.GL_POINTS, state=buffer.pointers[0]))
+                  for buffer in particles.buffers)
+
+    def upload():
+        for _ in range(frames):
+            position = state[:, :2] + state[:, 2:] * dt
+            state[:, 2:] = np.where(np.abs(position) > 1., -state[:, 2:], state[:, 2:])
+            state[:, :2] = position
+            cpu.set_data(state)
+        GL.glFinish()
+
+    def feedback():
+        for _ in range(frames):
+            with program.capture(particles.destination, query=False):
+                meshes[particles.source].draw(dt=dt)
+            particles.swap()
+        GL.glFinish()
+
+    before = timed(upload)[0]
+    after = timed(feedback)[0]
+    print('feedback: {} particles, numpy + upload {:.2f} ms/frame, transform feedback {:.2f} ms/frame'.format(
+        count, before / frames * 1000., after / frames * 1000.))
+
+INSTANCED_VERTEX_SHADER = """
+#version 330
+in vec3 position;
+in mat4 model;
+void main() {
+    gl_Position = model * vec4(position, 1.0);
+}
+"""
+
+def bench_instancing(count=5000, frames=10):
+    pipeline, meshes = create_scene(count)
+    models = np.tile(np.eye(4, dtype=np.float32), (count, 1, 1))
+    models[:, 3, :3] = np.random.uniform(-1., 1., (count, 3))
+    color = np.ones(4, dtype=np.float32)
+
+    program = gl.Program(shaders=[gl.VertexShader(INSTANCED_VERTEX_SHADER), gl.FragmentShader(FRAGMENT_SHADER)])
+    data, _ = gl.create_cube()
+    vbo = gl.VertexBuffer(data=data.astype(np.float32))
+    instances = gl.VertexBuffer(data=models)
+    instanced = gl.Mesh(gl.Pipeline(program), indices=meshes[0].indices,
+                        position=vbo.pointers[0], model=instances.instance_pointers()[0])
+
+    def loop():
+        for _ in range(frames):
+            for mesh, model in zip(meshes, models):
+                mesh.draw(modelview=model, color=color)
+        GL.glFinish()
+
+    def instance():
+        for _ in range(frames):
+            instanced.draw(instances=count, color=color)
+        GL.glFinish()
+
+    before = timed(loop)[0]
+    after = timed(instance)[0]
+    print('instancing: {} meshes, loop {:.2f} ms/frame, instanced {:.2f} ms/frame'.format(
+        count, before / frames * 1000., after / frames * 1000.))
+
+if __name__ == '__main__':
+    with quick_window(640, 480, "bench") as window:
+        bench_bindings()
+        bench_dispatch()
+        bench_teardown()
+        bench_create()
+        bench_stream()
+        bench_swap()
+        bench_indirect()
+        bench_upload()
+        bench_feedback()
+        bench_instancing()
+        bench_vertex_array_cache()
+        bench_compaction()
+        bench_render_queue()
@@ -68,7 +68,7 @@ def shader2():
 
 with quick_window(640, 480, "test") as window:
     program = gl.Program(shaders=list(test_shader()))
-    pipelineA = gl.Pipeline(program)
+    pipelineA = gl.Pipeline(program, render_state=gl.RenderState(depth_test=True, cull_face=True))
     data, indices = gl.create_cube((5.,5.,5.,), st=True)
     cube_flat_data = pipelineA.format(data[indices])
     cube_vbo = gl.VertexBuffer(data=cube_flat_data)
@@ -76,7 +76,7 @@ with quick_window(640, 480, "test") as window:
     cube = gl.Mesh(pipelineA, **cube_vbo.pointers)
 
     fbprogram = gl.Program(shaders=list(shader2()))
-    pipelineB = gl.Pipeline(fbprogram)
+    pipelineB = gl.Pipeline(fbprogram, render_state=gl.RenderState())
     data, indices = gl.create_quad((2.,2.,), st=True)
     quad_flat_data = pipelineB.format(data[indices])
     quad_vbo = gl.VertexBuffer(data=quad_flat_data)
@@ -104,8 +104,6 @@ with quick_window(640, 480, "test") as window:
 
         with fbo:
             GL.glClearColor(1.0, 0.2, 0.2, 1.0)
-            GL.glEnable(GL.GL_DEPTH_TEST)
-            GL.glEnable(GL.GL_CULL_FACE)
             GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT) # type: ignore
             GL.glViewport(0, 0, width, height)
             cube.draw(projection=projection, modelview=model_view, in_buffer=tb.texture)
@@ -113,8 +111,9 @@ with quick_window(640, 480, "test") as window:
         projection_fbo = rr.Matrix44.orthogonal_projection(-1., 1., -1., 1., -1., 1., np.float32)
         model_view_fbo = rr.Matrix44.identity(np.float32)
         GL.glClearColor(0.2, 0.2, 0.2, 1.0)
-        GL.glDisable(GL.GL_DEPTH_TEST)
-        GL.glDisable(GL.GL_CULL_FACE)
         GL.glClear(GL.GL_COLOR_BUFFER_BIT)
         GL.glViewport(0, 0, width*2, height*2)
         quad.draw(projection=projection_fbo, modelview=model_view_fbo, in_buffer=fbo.texture)
+
+        # deletes the objects released this frame
+        gl.end_frame()
@@ -47,9 +47,13 @@
 # of the authors and should not be interpreted as representing official policies, 
 # either expressed or implied, of the FreeBSD Project.
 
+from .state import *
+from .render_state import *
+from .query import *
 from .buffer import *
 from .shader import *
 from .texture import *
 from .pipeline import *
 from .mesh import *
+from .render_queue import *
 from .geometry import *
\ No newline at end of file
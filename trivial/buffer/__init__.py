@@ -1,5 +1,16 @@
-from .buffer import (Buffer, MappedBuffer, ArrayBuffer, ElementBuffer, AtomicCounterBuffer,
-                     CopyReadBuffer, DrawIndirectBuffer, PixelUnpackBuffer, TextureBuffer,
-                     TransformFeedbackBuffer, VertexBuffer, UnmanagedBuffer)
+from .buffer import (Buffer, MappedBuffer, ReadbackFuture, ArrayBuffer, ElementBuffer, AtomicCounterBuffer,
+                     CopyReadBuffer, CopyWriteBuffer, DrawIndirectBuffer, PixelUnpackBuffer, TextureBuffer,
+                     TransformFeedbackBuffer, UniformBuffer, ShaderStorageBuffer, VertexBuffer, IndexBuffer, UnmanagedBuffer)
+from .layout import std140, std430
+from .indices import index_dtype, compact_indices, split_indices
+from .vertices import compact_vertices, pack_snorm_2_10_10_10, unpack_snorm_2_10_10_10
+from .indirect import (DrawArraysIndirectCommand, DrawElementsIndirectCommand, draw_arrays_commands,
+                       draw_elements_commands, commands_for_indices)
 from .buffer_pointer import BufferPointer
-from .vertex_array import VertexArray, UnmanagedVertexArray
+from .streaming_buffer import StreamingBuffer
+from .arena import BufferArena, VertexArena, IndexArena
+from .dynamic_buffer import DynamicArrayBuffer
+from .shadowed_buffer import ShadowedVertexBuffer, ShadowedIndexBuffer
+from .ping_pong import PingPongBuffers
+from .texture_upload import TextureUploader
+from .vertex_array import VertexArray, UnmanagedVertexArray, VertexArrayCache, vertex_array_cache
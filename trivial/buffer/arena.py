@@ -0,0 +1,163 @@
+import weakref
+from bisect import bisect_left
+from functools import reduce
+import numpy as np
+from OpenGL import GL
+from .buffer import ArrayBuffer, CopyWriteBuffer, VertexBuffer, IndexBuffer
+
+class _Allocation(object):
+    def __init__(self, start, count):
+        self.start = start
+        self.count = count
+        self.view = None
+
+class BufferArena(object):
+    """Sub-allocates ranges of one large buffer, so many meshes can share
+    a single vertex or index buffer.
+
+    The shape is the capacity in elements followed by the shape of each
+    element, like the shape of a Buffer. allocate() returns a view of the
+    buffer of the same class, whose pointers and offsets are relative to
+    the shared buffer. A range is freed when its view is freed or garbage
+    collected.
+
+    Index views allocated with vertices= draw with the vertex view's first
+    element as their base vertex, so all meshes can use the same vertex
+    array built from the arena's pointers.
+    """
+    def __init__(self, buffer_class, shape, dtype, usage=None):
+        if isinstance(shape, int):
+            shape = (shape,)
+        self._buffer_class = buffer_class
+        self._buffer = buffer_class(shape=shape, dtype=dtype, usage=usage)
+        self._capacity = shape[0]
+        self._element_shape = tuple(shape[1:])
+        self._element_nbytes = reduce(lambda x,y: x*y, self._element_shape, 1) * np.dtype(dtype).itemsize
+        # sorted, coalesced (start, count) ranges
+        self._free = [(0, self._capacity)]
+        self._allocations = {}
+
+    def allocate(self, data=None, count=None, vertices=None):
+        """Allocates count elements, or enough for data which is uploaded.
+        Raises ValueError if no free range is large enough.
+        """
+        if data is not None:
+            data = np.asarray(data, dtype=self._buffer.dtype)
+            count = data.shape[0] if data.ndim else 1
+        if not count:
+            raise ValueError('Invalid parameters')
+
+        for index, (start, size) in enumerate(self._free):
+            if size >= count:
+                break
+        else:
+            raise ValueError('Arena is full')
+
+        if size == count:
+            del self._free[index]
+        else:
+            self._free[index] = (start + count, size - count)
+
+        allocation = _Allocation(start, count)
+        view = self._create_view(allocation, data)
+        if vertices is not None:
+            view.vertices = vertices
+        self._allocations[id(allocation)] = allocation
+        weakref.finalize(view, self._release, id(allocation))
+        return view
+
+    def _create_view(self, allocation, data=None):
+        view = self._buffer_class(
+            data=data,
+            shape=(allocation.count,) + self._element_shape,
+            dtype=self._buffer.dtype,
+            buffer=self._buffer,
+            offset=allocation.start * self._element_nbytes,
+        )
+        view._allocation = allocation
+        allocation.view = weakref.ref(view)
+        return view
+
+    def free(self, view):
+        allocation = getattr(view, '_allocation', None)
+        if allocation is None or id(allocation) not in self._allocations:
+            raise ValueError('Buffer was not allocated from this arena')
+        self._release(id(allocation))
+
+    def _release(self, key):
+        allocation = self._allocations.pop(key, None)
+        if allocation is None:
+            return
+
+        start, count = allocation.start, allocation.count
+        index = bisect_left(self._free, (start, count))
+        # merge with the following and preceding free ranges
+        if index < len(self._free) and self._free[index][0] == start + count:
+            count += self._free.pop(index)[1]
+        if index > 0 and sum(self._free[index - 1]) == start:
+            index -= 1
+            start, previous = self._free.pop(index)
+            count += previous
+        self._free.insert(index, (start, count))
+
+    def compact(self):
+        """Moves all allocations to the start of the buffer, leaving a single
+        free range at the end.
+
+        The data is packed into a temporary buffer and copied back in one
+        call, so the shared buffer's handle and anything pointing at it,
+        such as vertex arrays built from the arena's pointers, stay valid.
+        Views are updated in place, but vertex arrays built from a view's
+        own pointers must be rebuilt.
+        """
+        allocations = sorted(self._allocations.values(), key=lambda a: a.start)
+        used = sum(allocation.count for allocation in allocations)
+        if not allocations or self._free == [(used, self._capacity - used)]:
+            return
+
+        scratch = CopyWriteBuffer(shape=(used * self._element_nbytes,), dtype=np.uint8, usage=GL.GL_STREAM_COPY)
+        start = 0
+        for allocation in allocations:
+            self._buffer.copy_to(scratch, allocation.count * self._element_nbytes,
+                                 allocation.start * self._element_nbytes, start * self._element_nbytes)
+            allocation.start = start
+            start += allocation.count
+        scratch.copy_to(self._buffer, used * self._element_nbytes)
+
+        for allocation in allocations:
+            view = allocation.view()
+            if view is not None:
+                view._offset = allocation.start * self._element_nbytes
+                if isinstance(view, ArrayBuffer):
+                    view._create_pointers()
+        self._free = [(used, self._capacity - used)] if used < self._capacity else []
+
+    @property
+    def buffer(self):
+        return self._buffer
+
+    @property
+    def pointers(self):
+        """Pointers to the start of the shared buffer, for drawing with base vertices.
+        """
+        return self._buffer.pointers
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def used(self):
+        return sum(allocation.count for allocation in self._allocations.values())
+
+    @property
+    def free_ranges(self):
+        return list(self._free)
+
+class VertexArena(BufferArena):
+    def __init__(self, shape, dtype, usage=None):
+        super(VertexArena, self).__init__(VertexBuffer, shape, dtype, usage)
+
+class IndexArena(BufferArena):
+    def __init__(self, shape, dtype=np.uint32, usage=None):
+        super(IndexArena, self).__init__(IndexBuffer, shape, dtype, usage)
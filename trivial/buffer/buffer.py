@@ -1,27 +1,58 @@
 import ctypes
 from copy import copy
-from functools import reduce
+from functools import partial, reduce
 import numpy as np
 from OpenGL import GL
 from ..object import ManagedObject, BindableObject, UnmanagedObject
+from ..state import binding_state, binding_points, deletion_queue, direct_state_access
 from .buffer_pointer import BufferPointer
 from ..texture import BufferTexture
+from .layout import std140, std430, aligned, assign
+from .indices import compact_indices
 from .. import dtypes
 
 def create_numpy_view(ptr, nbytes, dtype):
-    buf = (ctypes.c_ubyte * nbytes).from_address(ptr)  # More direct approach
-    # buf = (ctypes.c_ubyte * nbytes).from_address(ptr)
-    return np.frombuffer(buf, dtype=dtype).copy() # .copy() makes a new copy, so you can safely modify it
+    # aliases the memory at ptr, the view is only valid while it is mapped
+    buf = (ctypes.c_ubyte * nbytes).from_address(ptr)
+    return np.frombuffer(buf, dtype=dtype)
+
+def _orphan(usage, handle):
+    # drop the data store of a recycled handle, glBufferData gives it a new
+    # one when the handle is reused
+    if direct_state_access():
+        GL.glNamedBufferData(handle, 0, None, usage)
+    else:
+        binding_state().bind((GL.glBindBuffer, GL.GL_COPY_WRITE_BUFFER, 0), handle,
+                             partial(GL.glBindBuffer, GL.GL_COPY_WRITE_BUFFER))
+        GL.glBufferData(GL.GL_COPY_WRITE_BUFFER, 0, None, usage)
+
+def _bind_range(target, index, value):
+    GL.glBindBufferRange(target, index, *value)
+
+# glMapBuffer access to glMapBufferRange access bits
+_ACCESS_BITS = {
+    GL.GL_READ_ONLY: GL.GL_MAP_READ_BIT,
+    GL.GL_WRITE_ONLY: GL.GL_MAP_WRITE_BIT,
+    GL.GL_READ_WRITE: GL.GL_MAP_READ_BIT | GL.GL_MAP_WRITE_BIT,
+}
 
 class Buffer(BindableObject, ManagedObject):
     _create_func = GL.glGenBuffers
     _delete_func = GL.glDeleteBuffers
+    _dsa_create_func = GL.glCreateBuffers
     _bind_func = GL.glBindBuffer
+    _pooled = True
+    # glBufferData re-specifies the whole data store of a recycled handle
+    _recycle = True
     _target = None
     _usage = GL.GL_STATIC_DRAW
+    # nbytes may change after creation, and may start at 0
+    _resizable = False
 
     def __init__(self, data=None, shape=None, dtype=None, buffer=None, offset=0, usage=None):
-        super(Buffer, self).__init__(handle=buffer.handle if buffer else None)
+        # views of another buffer share its handle but don't own it
+        super(Buffer, self).__init__(handle=buffer.handle if buffer else None, dontdelete=buffer is not None)
+        self._parent = buffer
         if data is not None:
             data = np.array(data, dtype=dtype)
             self._nbytes = data.nbytes
@@ -38,58 +69,181 @@ class Buffer(BindableObject, ManagedObject):
         self._offset = offset
         self._usage = usage or self._usage
         self._mapped_buffer = None
+        self._staging = None
 
-        if not self._nbytes:
+        if not self._nbytes and not self._resizable:
             raise ValueError('Invalid parameters')
 
         if not buffer:
-            with self:
-                GL.glBufferData(self._target, self._nbytes, data, self._usage)
+            self._create_storage(data)
         elif data is not None:
             self.set_data(data)
 
-    def get_data(self, offset=0, nbytes=None):
-        nbytes = nbytes or (self._nbytes - offset)
-        offset = offset + self._offset
+    def _release_call(self):
+        return partial(_orphan, self._usage)
+
+    def _create_storage(self, data):
+        if direct_state_access():
+            GL.glNamedBufferData(self._handle, self._nbytes, data, self._usage)
+        else:
+            with self:
+                GL.glBufferData(self._target, self._nbytes, data, self._usage)
+
+    def get_data(self, offset=0, nbytes=None, out=None):
+        """Reads nbytes of the buffer from offset.
+
+        If out is given it must be a contiguous array, nbytes defaults to
+        out.nbytes and the data is read into out in place, which is returned.
+        """
+        if out is not None:
+            if not out.flags.c_contiguous:
+                raise ValueError('out must be contiguous')
+            if nbytes is None:
+                nbytes = out.nbytes
+            if nbytes > out.nbytes:
+                raise ValueError('out is too small')
+        if nbytes is None:
+            nbytes = self._nbytes - offset
+
+        # PyOpenGL copies arrays it doesn't consider bytes, read into a byte view
+        data = out.reshape(-1).view(np.uint8) if out is not None else np.empty((nbytes,), dtype=np.uint8)
+        if direct_state_access():
+            GL.glGetNamedBufferSubData(self._handle, self._offset + offset, nbytes, data)
+        else:
+            with self:
+                GL.glGetBufferSubData(self._target, self._offset + offset, nbytes, data)
+        if out is not None:
+            return out
 
-        with self:
-            data = GL.glGetBufferSubData(self._target, offset, nbytes)
         data = data.view(dtype=self._dtype)
-        data.shape = self._shape
+        if nbytes == self._nbytes:
+            data.shape = self._shape
         return data
 
+    def read_async(self, offset=0, nbytes=None, out=None):
+        """Starts reading nbytes of the buffer from offset without waiting
+        for the GPU.
+
+        The data is copied on the GPU into a staging buffer, returns a
+        ReadbackFuture which can be polled with done().
+        """
+        if nbytes is None:
+            nbytes = out.nbytes if out is not None else self._nbytes - offset
+        staging = self._staging
+        if staging is None or staging.nbytes < nbytes:
+            staging = CopyWriteBuffer(shape=(nbytes,), dtype=np.uint8, usage=GL.GL_STREAM_READ)
+        else:
+            self._staging = None
+        self.copy_to(staging, nbytes, offset)
+        fence = GL.glFenceSync(GL.GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+        # make sure the fence reaches the GPU, or polling never sees it signal
+        GL.glFlush()
+
+        shape = self._shape if out is None and nbytes == self._nbytes else None
+        return ReadbackFuture(self, staging, fence, nbytes, out, self._dtype, shape)
+
     def set_data(self, data, offset=0):
         offset = offset + self._offset
-        with self:
-            GL.glBufferSubData(self._target, offset, data.nbytes, data)
-
-    def _ptr_to_np(self, ptr, access):
-        func = ctypes.pythonapi.PyBuffer_FromMemory
-        func.restype = ctypes.py_object
-        try:
-            buf = create_numpy_view(ptr, self._nbytes, self._dtype)
-            buf.shape = self._shape
-            mapped_buffer = MappedBuffer(buf, access=access)
-            return mapped_buffer
-        except Exception as e:
-            raise ValueError(str(e))
-
-    def map(self, access=GL.GL_READ_WRITE):
+        if direct_state_access():
+            GL.glNamedBufferSubData(self._handle, offset, data.nbytes, data)
+        else:
+            with self:
+                GL.glBufferSubData(self._target, offset, data.nbytes, data)
+
+    def bind_range(self, index, offset=0, nbytes=None, target=None):
+        """Binds nbytes of the buffer from offset to an indexed binding point
+        of its target, ie. a uniform block binding.
+        target overrides the buffer's, ie. to capture transform feedback
+        into a vertex buffer.
+        """
+        target = target or self._target
+        nbytes = nbytes or (self._nbytes - offset)
+        state = binding_state()
+        value = (self._handle, self._offset + offset, nbytes)
+        if state.bind((GL.glBindBufferRange, target, index), value, partial(_bind_range, target, index)):
+            # the target's generic binding point is bound as well
+            state.set_bound((self._bind_func, target, 0), self._handle)
+
+    def bind_base(self, index):
+        self.bind_range(index)
+
+    def copy_to(self, buffer, nbytes=None, offset=0, dst_offset=0):
+        """Copies nbytes from this buffer into another buffer, on the GPU.
+        Offsets are relative to each buffer, which may be the same buffer if
+        the ranges don't overlap.
+        """
+        nbytes = nbytes or (self._nbytes - offset)
+        offset = offset + self._offset
+        dst_offset = dst_offset + buffer._offset
+        if direct_state_access():
+            GL.glCopyNamedBufferSubData(self._handle, buffer.handle, offset, dst_offset, nbytes)
+        else:
+            src = CopyReadBuffer(buffer=self, shape=self._shape, dtype=self._dtype)
+            dst = CopyWriteBuffer(buffer=buffer, shape=buffer.shape, dtype=buffer.dtype)
+            with src, dst:
+                GL.glCopyBufferSubData(GL.GL_COPY_READ_BUFFER, GL.GL_COPY_WRITE_BUFFER, offset, dst_offset, nbytes)
+
+    def map(self, access=GL.GL_READ_WRITE, offset=0, nbytes=None, flags=0):
+        """Maps the buffer and returns a MappedBuffer aliasing its memory.
+
+        access is GL_READ_ONLY, GL_WRITE_ONLY or GL_READ_WRITE.
+        flags are any of GL_MAP_INVALIDATE_RANGE_BIT, GL_MAP_INVALIDATE_BUFFER_BIT,
+        GL_MAP_UNSYNCHRONIZED_BIT and GL_MAP_FLUSH_EXPLICIT_BIT.
+        offset and nbytes select a range of the buffer, which must be a
+        whole number of elements.
+        """
         if self._mapped_buffer is not None:
             raise ValueError('Buffer is already mapped')
 
-        with self:
-            ptr = GL.glMapBuffer(self._target, access)
+        nbytes = nbytes or (self._nbytes - offset)
+        itemsize = np.dtype(self._dtype).itemsize
+        if offset % itemsize or nbytes % itemsize or offset + nbytes > self._nbytes:
+            raise ValueError('Invalid map range')
 
-        self._mapped_buffer = self._ptr_to_np(ptr, access)
+        bits = _ACCESS_BITS[access] | flags
+        if direct_state_access():
+            ptr = GL.glMapNamedBufferRange(self._handle, self._offset + offset, nbytes, bits)
+        else:
+            with self:
+                ptr = GL.glMapBufferRange(self._target, self._offset + offset, nbytes, bits)
+        ptr = getattr(ptr, 'value', ptr)
+        if not ptr:
+            raise ValueError('Failed to map buffer')
+
+        data = create_numpy_view(ptr, nbytes, self._dtype)
+        if nbytes == self._nbytes:
+            data.shape = self._shape
+        self._mapped_buffer = MappedBuffer(data, access=access, buffer=self)
+        self._mapped_flags = bits
         return self._mapped_buffer
 
+    def flush_range(self, offset=0, nbytes=None):
+        """Flushes writes to a range of a buffer mapped with GL_MAP_FLUSH_EXPLICIT_BIT.
+        offset is relative to the start of the mapping.
+        """
+        if self._mapped_buffer is None:
+            raise ValueError('Buffer not mapped')
+        if not self._mapped_flags & GL.GL_MAP_FLUSH_EXPLICIT_BIT:
+            raise ValueError('Buffer not mapped with GL_MAP_FLUSH_EXPLICIT_BIT')
+
+        nbytes = nbytes or (self._mapped_buffer.nbytes - offset)
+        if direct_state_access():
+            GL.glFlushMappedNamedBufferRange(self._handle, offset, nbytes)
+        else:
+            with self:
+                GL.glFlushMappedBufferRange(self._target, offset, nbytes)
+
     def unmap(self):
         if self._mapped_buffer is None:
             raise ValueError('Buffer not mapped')
 
-        with self:
-            GL.glUnmapBuffer(self._target)
+        # the memory goes away, stop the view and any views of it being used
+        self._mapped_buffer._mapping.valid = False
+        if direct_state_access():
+            GL.glUnmapNamedBuffer(self._handle)
+        else:
+            with self:
+                GL.glUnmapBuffer(self._target)
 
         self._mapped_buffer = None
 
@@ -105,6 +259,17 @@ class Buffer(BindableObject, ManagedObject):
     def nbytes(self):
         return self._nbytes
 
+    @property
+    def offset(self):
+        return self._offset
+
+    @property
+    def first(self):
+        """Index of the first element of a view in the buffer it views.
+        """
+        element_nbytes = reduce(lambda x,y: x*y, self._shape[1:], 1) * np.dtype(self._dtype).itemsize
+        return self._offset // element_nbytes
+
     @property
     def usage(self):
         return self._usage
@@ -132,32 +297,173 @@ class Buffer(BindableObject, ManagedObject):
 class UnmanagedBuffer(Buffer, UnmanagedObject):
     pass
 
+class ReadbackFuture(object):
+    """Result of Buffer.read_async, resolved once the GPU has finished the copy.
+
+    A future dropped before it resolves deletes its fence on the next flush
+    of the context's deletion queue.
+    """
+    def __init__(self, buffer, staging, fence, nbytes, out, dtype, shape):
+        self._buffer = buffer
+        self._staging = staging
+        self._fence = fence
+        self._deletion_queue = deletion_queue()
+        self._nbytes = nbytes
+        self._out = out
+        self._dtype = dtype
+        self._shape = shape
+        self._result = None
+
+    def __del__(self):
+        if getattr(self, '_fence', None) is not None:
+            self._deletion_queue.enqueue(GL.glDeleteSync, False, None, self._fence)
+            self._fence = None
+        # GL orders the pending copy before any later use of the staging buffer
+        if getattr(self, '_staging', None) is not None:
+            if self._buffer._staging is None:
+                self._buffer._staging = self._staging
+            self._staging = None
+
+    def _wait(self, timeout):
+        if self._fence is None:
+            return True
+        # flush the fence itself when blocking, or it may never be signaled
+        flags = GL.GL_SYNC_FLUSH_COMMANDS_BIT if timeout else 0
+        result = GL.glClientWaitSync(self._fence, flags, timeout)
+        if result in (GL.GL_ALREADY_SIGNALED, GL.GL_CONDITION_SATISFIED):
+            self._resolve()
+            return True
+        if result == GL.GL_WAIT_FAILED:
+            raise RuntimeError('Waiting for the readback failed')
+        return False
+
+    def _resolve(self):
+        GL.glDeleteSync(self._fence)
+        self._fence = None
+        out = self._out if self._out is not None else np.empty((self._nbytes,), dtype=np.uint8)
+        self._staging.get_data(nbytes=self._nbytes, out=out)
+        if self._out is None:
+            out = out.view(dtype=self._dtype)
+            if self._shape is not None:
+                out.shape = self._shape
+        self._result = out
+        # hand the staging buffer back for the next read
+        self._buffer._staging = self._staging
+        self._staging = None
+
+    def done(self):
+        """Returns True if the data is available, never blocks.
+        """
+        return self._wait(0)
+
+    def result(self, timeout=None):
+        """Returns the data, blocking until the GPU has finished the copy.
+        timeout is in seconds, raises TimeoutError if it expires and
+        RuntimeError if the wait fails.
+        """
+        if timeout is None:
+            while not self._wait(1000000000):
+                pass
+        elif not self._wait(int(timeout * 1e9)):
+            raise TimeoutError('Readback not complete')
+        return self._result
+
+class _Mapping(object):
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.valid = True
+
 class MappedBuffer(np.ndarray):
-    def __new__(cls, input_array, access=None):
+    """ndarray aliasing the memory of a mapped Buffer.
+
+    The memory is released when the buffer is unmapped, after which
+    indexing, ufuncs, numpy functions, tobytes, tolist, view and the buffer
+    protocol (Python 3.12+) raise a ValueError, on the array and its views.
+    np.asarray and the array's base skip the subclass entirely and still
+    alias the released memory, don't keep them past unmap.
+    """
+    def __new__(cls, input_array, access=None, buffer=None):
         obj = np.asarray(input_array)
         obj = obj.view(cls)
         obj.access = access
+        obj._mapping = _Mapping(buffer)
+        if access == GL.GL_READ_ONLY:
+            obj.flags.writeable = False
         return obj
 
     def __array_finalize__(self, obj):
         if obj is None:
             return
         self.access = getattr(obj, 'access', None)
+        self._mapping = getattr(obj, '_mapping', None)
+
+    def _check(self):
+        mapping = self.__dict__.get('_mapping')
+        if mapping is not None and not mapping.valid:
+            raise ValueError('Buffer has been unmapped')
+
+    def __getitem__(self, index):
+        self._check()
+        return super(MappedBuffer, self).__getitem__(index)
 
     def __setitem__(self, index, value):
+        self._check()
         if self.access not in (GL.GL_WRITE_ONLY, GL.GL_READ_WRITE):
             raise ValueError("Mapped buffer is read only")
         super(MappedBuffer, self).__setitem__(index, value)
 
-    def __setslice__(self, start, stop, value):
-        if self.access not in (GL.GL_WRITE_ONLY, GL.GL_READ_WRITE):
-            raise ValueError("Mapped buffer is read only")
-        super(MappedBuffer, self).__setslice__(start, stop, value)  # type: ignore
+    def __array__(self, *args, **kwargs):
+        self._check()
+        return super(MappedBuffer, self).__array__(*args, **kwargs)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        for value in inputs + kwargs.get('out', ()):
+            if isinstance(value, MappedBuffer):
+                value._check()
+        inputs = tuple(value.view(np.ndarray) if isinstance(value, MappedBuffer) else value for value in inputs)
+        if 'out' in kwargs:
+            kwargs['out'] = tuple(value.view(np.ndarray) if isinstance(value, MappedBuffer) else value for value in kwargs['out'])
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    def __array_function__(self, func, types, args, kwargs):
+        self._check()
+        return super(MappedBuffer, self).__array_function__(func, types, args, kwargs)
+
+    def __repr__(self):
+        self._check()
+        return super(MappedBuffer, self).__repr__()
+
+    def tobytes(self, *args, **kwargs):
+        self._check()
+        return super(MappedBuffer, self).tobytes(*args, **kwargs)
+
+    def tolist(self):
+        self._check()
+        return super(MappedBuffer, self).tolist()
+
+    def view(self, *args, **kwargs):
+        self._check()
+        return super(MappedBuffer, self).view(*args, **kwargs)
+
+    def __buffer__(self, flags):
+        # memoryview, bytes() etc, only called by Python 3.12 and later
+        self._check()
+        return super(MappedBuffer, self).__buffer__(flags)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._mapping.valid:
+            self.unmap()
+
+    def flush_range(self, offset=0, nbytes=None):
+        self._check()
+        self._mapping.buffer.flush_range(offset, nbytes)
 
     def unmap(self):
-        # TODO: somehow mark this buffer as unusable
-        #self.data = None
-        pass
+        self._check()
+        self._mapping.buffer.unmap()
 
 
 class ArrayBufferMixin(object):
@@ -193,39 +499,91 @@ class TransformFeedbackBufferMixin(object):
 class UniformBufferMixin(object):
     _target = GL.GL_UNIFORM_BUFFER
 
+class ShaderStorageBufferMixin(object):
+    _target = GL.GL_SHADER_STORAGE_BUFFER
+
 
 class ArrayBuffer(ArrayBufferMixin, Buffer):
     # TODO: add a bind method that binds the current buffer based on dtype size
     # TODO: add a bind method that binds sub-sections of the buffer based on complex dtypes
     def __init__(self, data=None, shape=None, dtype=None, buffer=None, offset=0, usage=None):
         super(ArrayBuffer, self).__init__(data=data, shape=shape, dtype=dtype, buffer=buffer, offset=offset, usage=usage)
+        self._create_pointers()
 
+    def _create_pointers(self, divisor=0, columns=1):
         # create a list of pointers
         dtype = np.dtype(self._dtype)
         if dtype.names:
             # complex dtype
-            self._pointers = dict(
-                (name, BufferPointer.for_np_buffer(self, name))
+            pointers = dict(
+                (name, BufferPointer.for_np_buffer(self, name, divisor=divisor))
                 for name in dtype.names
             )
         else:
             # basic dtype
-            self._pointers = [BufferPointer.for_np_buffer(self)]
+            pointers = [BufferPointer.for_np_buffer(self, divisor=divisor, columns=columns)]
+        if not divisor:
+            self._pointers = pointers
+        return pointers
 
     @property
     def pointers(self) -> dict[str, BufferPointer] | list:
         return copy(self._pointers)
 
+    def instance_pointers(self, divisor=1, columns=None):
+        """Pointers like pointers, which advance once every divisor
+        instances rather than once per vertex.
+        A plain (count, columns, rows) buffer of 2 to 4 columns and rows
+        holds a matrix per instance, other buffers only if given columns.
+        """
+        if columns is None:
+            columns = self._shape[-2] if len(self._shape) == 3 and all(2 <= size <= 4 for size in self._shape[-2:]) else 1
+        return self._create_pointers(divisor, columns)
+
 class ElementBuffer(ElementBufferMixin, Buffer):
-    def render(self, primitive=GL.GL_TRIANGLES, start=None, count=None):
+    # the vertices indexed, when they are a view of a shared buffer
+    vertices = None
+
+    _index_types = (np.uint8, np.uint16, np.uint32)
+
+    def __init__(self, data=None, shape=None, dtype=None, buffer=None, offset=0, usage=None):
+        super(ElementBuffer, self).__init__(data=data, shape=shape, dtype=dtype, buffer=buffer, offset=offset, usage=usage)
+        # resolved once, rather than on every draw
+        dtype = dtypes.for_dtype(np.dtype(self._dtype))
+        if dtype.dtype not in self._index_types:
+            raise ValueError('Indices must be uint8, uint16 or uint32')
+        self._index_type = dtype.gl_enum
+        self._index_nbytes = np.dtype(dtype.dtype).itemsize
+
+    @property
+    def index_type(self):
+        return self._index_type
+
+    @property
+    def base_vertex(self):
+        return self.vertices.first if self.vertices is not None else 0
+
+    def render(self, primitive=GL.GL_TRIANGLES, start=None, count=None, base_vertex=None, instances=None, base_instance=0):
         count = count or self.size
-        dtype = dtypes.for_dtype(self.dtype)
-        gl_enum = dtype.gl_enum
-        offset = (start or 0) * np.dtype(dtype.dtype).itemsize
+        offset = self._offset + (start or 0) * self._index_nbytes
         # convert to ctypes void pointer
         offset = ctypes.c_void_p(offset)
+        base_vertex = self.base_vertex if base_vertex is None else base_vertex
         with self:
-            GL.glDrawElements(primitive, count, gl_enum, offset)
+            if instances is None:
+                if base_vertex:
+                    GL.glDrawElementsBaseVertex(primitive, count, self._index_type, offset, base_vertex)
+                else:
+                    GL.glDrawElements(primitive, count, self._index_type, offset)
+            elif base_instance:
+                if base_vertex:
+                    GL.glDrawElementsInstancedBaseVertexBaseInstance(primitive, count, self._index_type, offset, instances, base_vertex, base_instance)
+                else:
+                    GL.glDrawElementsInstancedBaseInstance(primitive, count, self._index_type, offset, instances, base_instance)
+            elif base_vertex:
+                GL.glDrawElementsInstancedBaseVertex(primitive, count, self._index_type, offset, instances, base_vertex)
+            else:
+                GL.glDrawElementsInstanced(primitive, count, self._index_type, offset, instances)
 
 class AtomicCounterBuffer(AtomicCounterBufferMixin, Buffer):
     pass
@@ -260,10 +618,124 @@ class TransformFeedbackBuffer(TransformFeedbackBufferMixin, Buffer):
     pass
 
 class UniformBuffer(UniformBufferMixin, Buffer):
+    """Buffer backing uniform blocks.
+
+    Given a layout the dtype is its std140 layout, see layout.std140, and
+    the shape is the number of blocks, padded to the offset alignment so
+    each can be bound by range.
+    Given a block name the buffer is bound to the binding point of that
+    name, which every program declaring the block also uses.
+    """
     _usage = GL.GL_DYNAMIC_DRAW
 
+    def __init__(self, data=None, shape=None, dtype=None, buffer=None, offset=0, usage=None, layout=None, block=None):
+        if layout is not None:
+            dtype = std140(layout)
+            shape = shape or (1,)
+            if shape[0] > 1:
+                dtype = aligned(dtype, int(GL.glGetIntegerv(GL.GL_UNIFORM_BUFFER_OFFSET_ALIGNMENT)))
+            if data is None:
+                data = np.zeros(shape, dtype=dtype)
+        super(UniformBuffer, self).__init__(data=data, shape=shape, dtype=dtype, buffer=buffer, offset=offset, usage=usage)
+        self._values = np.array(data, dtype=dtype) if data is not None else None
+        self.block = block
+        if block is not None:
+            self.bind_block()
+
+    def update(self, element=0, **values):
+        """Sets fields of one block and uploads it.
+        """
+        if self._values is None:
+            self._values = self.get_data()
+        record = self._values[element]
+        for name, value in values.items():
+            assign(record, name, value)
+        itemsize = np.dtype(self._dtype).itemsize
+        self.set_data(self._values[element:element + 1], offset=element * itemsize)
+
+    def bind_block(self, block=None, element=0):
+        """Binds one block of the buffer to the binding point of a block name.
+        """
+        block = block or self.block
+        itemsize = np.dtype(self._dtype).itemsize
+        self.bind_range(binding_points(self._target)[block], element * itemsize, itemsize)
+
+class ShaderStorageBuffer(ShaderStorageBufferMixin, Buffer):
+    """Buffer backing shader storage blocks.
+
+    Given a layout the dtype is its std430 layout, see layout.std430, and
+    the shape is the number of elements.
+    Given a block name the buffer is bound to the binding point of that
+    name, which every program declaring the block also uses.
+
+    A persistent buffer stays mapped, array is then a numpy view of the
+    buffer itself. Call synchronize() before reading results written by
+    shaders.
+    """
+    _usage = GL.GL_DYNAMIC_DRAW
+    _storage_flags = (GL.GL_DYNAMIC_STORAGE_BIT | GL.GL_MAP_READ_BIT | GL.GL_MAP_WRITE_BIT |
+                      GL.GL_MAP_PERSISTENT_BIT | GL.GL_MAP_COHERENT_BIT)
+
+    def __init__(self, data=None, shape=None, dtype=None, buffer=None, offset=0, usage=None, layout=None, block=None, persistent=False):
+        if layout is not None:
+            dtype = std430(layout)
+            shape = shape or (1,)
+        if persistent and buffer is not None:
+            raise ValueError('Views of a buffer can\'t be persistent')
+        self._persistent = persistent
+        if persistent:
+            # immutable storage can't be re-specified by another buffer
+            self._recycle = False
+        super(ShaderStorageBuffer, self).__init__(data=data, shape=shape, dtype=dtype, buffer=buffer, offset=offset, usage=usage)
+        self.block = block
+        self._array = None
+        if persistent:
+            self._array = self.map(GL.GL_READ_WRITE, flags=GL.GL_MAP_PERSISTENT_BIT | GL.GL_MAP_COHERENT_BIT)
+        if block is not None:
+            self.bind_block()
+
+    def _create_storage(self, data):
+        if not self._persistent:
+            return super(ShaderStorageBuffer, self)._create_storage(data)
+        if direct_state_access():
+            GL.glNamedBufferStorage(self._handle, self._nbytes, data, self._storage_flags)
+        else:
+            with self:
+                GL.glBufferStorage(self._target, self._nbytes, data, self._storage_flags)
+
+    @property
+    def array(self):
+        """numpy view of a persistent buffer's contents.
+        """
+        if self._array is None:
+            raise ValueError('Only persistent buffers have an array')
+        return self._array
+
+    def synchronize(self):
+        """Waits for shader writes to the buffer to be visible to array.
+        """
+        GL.glMemoryBarrier(GL.GL_CLIENT_MAPPED_BUFFER_BARRIER_BIT)
+        fence = GL.glFenceSync(GL.GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+        while GL.glClientWaitSync(fence, GL.GL_SYNC_FLUSH_COMMANDS_BIT, 1000000000) == GL.GL_TIMEOUT_EXPIRED:
+            pass
+        GL.glDeleteSync(fence)
+
+    def bind_block(self, block=None, offset=0, nbytes=None):
+        """Binds the buffer, or a range of it, to the binding point of a block name.
+        """
+        block = block or self.block
+        self.bind_range(binding_points(self._target)[block], offset, nbytes)
+
 class VertexBuffer(ArrayBuffer):
     pass
 
 class IndexBuffer(ElementBuffer):
-    pass
+    """Element buffer of vertex indices.
+
+    Given data without a dtype the indices are stored as the narrowest type
+    holding the largest index, see compact_indices.
+    """
+    def __init__(self, data=None, shape=None, dtype=None, buffer=None, offset=0, usage=None):
+        if data is not None and dtype is None:
+            data = compact_indices(data)
+        super(IndexBuffer, self).__init__(data=data, shape=shape, dtype=dtype, buffer=buffer, offset=offset, usage=usage)
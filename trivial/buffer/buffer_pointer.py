@@ -6,49 +6,189 @@ from .. import dtypes
 
 class BufferPointer(object):
     @classmethod
-    def for_np_buffer(cls, buffer, name=None):
+    def for_np_buffer(cls, buffer, name=None, dtype=None, offset=0, nbytes=None, divisor=0, columns=1):
+        """Creates a pointer to the named field of the buffer's dtype, or to
+        the whole element if the dtype is not structured.
+
+        dtype and offset describe data stored at a byte offset within the
+        buffer rather than the buffer's own dtype, nbytes limits the pointer
+        to that many bytes.
+        Fields of shape (columns, rows), ie. a mat4, span one location per
+        column. Plain buffers hold matrices when given columns, ie. a
+        (count, 4, 4) buffer with columns=4, otherwise the elements of every
+        axis but the last are vertices. Dtypes made by dtypes.vertex_format
+        are read normalized or packed.
+        """
         # create a list of pointers
-        dtype = np.dtype(buffer.dtype)
+        if dtype is None:
+            dtype = np.dtype(buffer.dtype)
+            count = buffer.shape[-1]
+            # views of a shared buffer start part way into it
+            if buffer.offset:
+                offset += buffer.offset
+                nbytes = nbytes or buffer.nbytes
+        else:
+            dtype = np.dtype(dtype)
+            count = reduce(lambda x,y: x*y, dtype.shape, 1)
         if name:
             # complex dtype
             assert dtype is not None and dtype.fields is not None
-            offset = dtype.fields[name][1]
-            count = reduce(lambda x,y: x*y, dtype[name].shape, 1)
-            pointer = BufferPointer(buffer=buffer, count=count, stride=dtype.itemsize, offset=offset, dtype=dtype[name].base) # type: ignore
+            shape = dtype[name].shape
+            columns = shape[0] if len(shape) == 2 else 1
+            count = reduce(lambda x,y: x*y, shape, 1) // columns
+            field_offset = dtype.fields[name][1]
+            metadata = dtypes.vertex_metadata(dtype[name])
+            packed = metadata.get('packed')
+            pointer = BufferPointer(buffer=buffer, count=4 if packed else count, stride=dtype.itemsize, offset=offset + field_offset, dtype=dtype[name].base, normalize=metadata.get('normalize', False), nbytes=nbytes, relative_offset=field_offset, divisor=divisor, columns=columns, packed=packed) # type: ignore
             return pointer
         else:
-            pointer = BufferPointer(buffer=buffer, count=buffer.shape[-1], stride=dtype.itemsize, offset=0, dtype=dtype.base) # type: ignore
+            metadata = dtypes.vertex_metadata(dtype)
+            packed = metadata.get('packed')
+            if packed:
+                # each element is one packed vec4
+                count, stride = 4, dtype.itemsize * columns
+            else:
+                # a plain dtype is one component, the element is the last axis
+                stride = dtype.itemsize if dtype.shape else count * columns * dtype.itemsize
+            pointer = BufferPointer(buffer=buffer, count=count, stride=stride, offset=offset, dtype=dtype.base, normalize=metadata.get('normalize', False), nbytes=nbytes, divisor=divisor, columns=columns, packed=packed) # type: ignore
             return pointer
 
-    def __init__(self, buffer, count=3, stride=0, offset=0, dtype=np.float32, normalize=False):
+    def __init__(self, buffer, count=3, stride=0, offset=0, dtype=np.float32, normalize=False, nbytes=None, relative_offset=0, divisor=0, columns=1, packed=None):
         self._buffer = buffer
         self.count = count
-        self.stride = stride or (count * np.dtype(dtype).itemsize)
+        # a dtypes.DataType packing count components into one dtype element,
+        # ie. dtypes.int_2_10_10_10_rev
+        self.packed = packed
+        self.stride = stride or (columns * self.column_nbytes if packed else count * columns * np.dtype(dtype).itemsize)
         self.offset = ctypes.c_void_p(offset) if offset else None
         self.dtype = dtype
         self.normalize = normalize
+        self.nbytes = nbytes
+        # offset of the attribute within each vertex, the rest of offset is
+        # where the vertices start in the buffer
+        self.relative_offset = relative_offset
+        # advance once per divisor instances instead of once per vertex
+        self.divisor = divisor
+        # matrices take a location per column of count components
+        self.columns = columns
+
+    @property
+    def column_nbytes(self):
+        if self.packed:
+            return np.dtype(self.packed.dtype).itemsize
+        return self.count * np.dtype(self.dtype).itemsize
+
+    @property
+    def data_type(self):
+        return self.packed or dtypes.for_dtype(self.dtype)
+
+    @property
+    def integral(self):
+        """Whether the attribute is read as integers, normalized and packed
+        attributes are read as floats.
+        """
+        return np.issubdtype(np.dtype(self.dtype), np.integer) and not self.normalize and not self.packed
 
     def enable(self, location):
-        dtype = dtypes.for_dtype(self.dtype)
+        dtype = self.data_type
+        base = self.offset.value if self.offset else 0
         with self._buffer:
-            GL.glEnableVertexAttribArray(location)
-            if dtype.dtype == np.float64:
-                # GL 4.1
-                # doubles
-                GL.glVertexAttribLPointer(location, self.count, dtype.gl_enum, self.stride, self.offset)
-            elif np.issubdtype(dtype.dtype, np.integer):
-                # GL 3.0
-                # integrals
-                GL.glVertexAttribIPointer(location, self.count, dtype.gl_enum, self.stride, self.offset)
-            else:
-                # all others
-                GL.glVertexAttribPointer(location, self.count, dtype.gl_enum, self.normalize, self.stride, self.offset)
+            for column in range(self.columns):
+                index = location + column
+                offset = ctypes.c_void_p(base + column * self.column_nbytes) if base or column else None
+                GL.glEnableVertexAttribArray(index)
+                if dtype.dtype == np.float64:
+                    # GL 4.1
+                    # doubles
+                    GL.glVertexAttribLPointer(index, self.count, dtype.gl_enum, self.stride, offset)
+                elif self.integral:
+                    # GL 3.0
+                    # integrals
+                    GL.glVertexAttribIPointer(index, self.count, dtype.gl_enum, self.stride, offset)
+                else:
+                    # all others, including normalized and packed integers
+                    GL.glVertexAttribPointer(index, self.count, dtype.gl_enum, self.normalize, self.stride, offset)
+                GL.glVertexAttribDivisor(index, self.divisor)
+
+    def enable_named(self, vertex_array, location):
+        """Direct state access version of enable, the vertex array and buffer
+        are not bound.
+        """
+        for column in range(self.columns):
+            GL.glEnableVertexArrayAttrib(vertex_array, location + column)
+        # use the attribute location as the buffer binding index
+        self.set_format_named(vertex_array, location, location)
+        self.bind_source_named(vertex_array, location)
+
+    def _format(self, dsa):
+        dtype = self.data_type
+        if dtype.dtype == np.float64:
+            func = GL.glVertexArrayAttribLFormat if dsa else GL.glVertexAttribLFormat
+            return func, (self.count, dtype.gl_enum)
+        if self.integral:
+            func = GL.glVertexArrayAttribIFormat if dsa else GL.glVertexAttribIFormat
+            return func, (self.count, dtype.gl_enum)
+        func = GL.glVertexArrayAttribFormat if dsa else GL.glVertexAttribFormat
+        return func, (self.count, dtype.gl_enum, self.normalize)
+
+    def set_format(self, location, binding):
+        """Specifies the format of the attribute at location, read from the
+        buffer bound to binding. The vertex array must be bound.
+        Requires GL 4.3 or ARB_vertex_attrib_binding.
+        """
+        func, args = self._format(False)
+        for column in range(self.columns):
+            func(location + column, *(args + (self.relative_offset + column * self.column_nbytes,)))
+            GL.glVertexAttribBinding(location + column, binding)
+
+    def set_format_named(self, vertex_array, location, binding):
+        func, args = self._format(True)
+        for column in range(self.columns):
+            func(vertex_array, location + column, *(args + (self.relative_offset + column * self.column_nbytes,)))
+            GL.glVertexArrayAttribBinding(vertex_array, location + column, binding)
+
+    def bind_source(self, binding):
+        """Binds the pointer's buffer to binding of the bound vertex array.
+        """
+        GL.glBindVertexBuffer(binding, self._buffer.handle, self.base_offset, self.stride)
+        GL.glVertexBindingDivisor(binding, self.divisor)
+
+    def bind_source_named(self, vertex_array, binding):
+        GL.glVertexArrayVertexBuffer(vertex_array, binding, self._buffer.handle, self.base_offset, self.stride)
+        GL.glVertexArrayBindingDivisor(vertex_array, binding, self.divisor)
 
     def disable(self, location):
-        GL.glDisableVertexAttribArray(location)
+        for column in range(self.columns):
+            GL.glDisableVertexAttribArray(location + column)
+
+    @property
+    def base_offset(self):
+        """Offset of the first vertex in the buffer.
+        """
+        return (self.offset.value if self.offset else 0) - self.relative_offset
+
+    @property
+    def format_signature(self):
+        """The attribute's format, pointers with equal formats read from
+        different buffers by only binding another vertex buffer.
+        """
+        return (self.count, int(self.data_type.gl_enum), self.normalize, self.relative_offset, self.columns)
+
+    @property
+    def source_signature(self):
+        return (self._buffer.handle, self.base_offset, self.stride, self.divisor)
+
+    @property
+    def signature(self):
+        """Everything glVertexAttribPointer is given, pointers with equal
+        signatures need not be specified again.
+        """
+        return self.format_signature + self.source_signature
 
     @property
     def size(self):
+        if self.nbytes is not None:
+            return self.nbytes // self.stride
         offset = 0
         if self.offset and self.offset.value:
             offset = self.offset.value
@@ -0,0 +1,85 @@
+from functools import reduce
+import numpy as np
+from OpenGL import GL
+from .buffer import ArrayBuffer, CopyWriteBuffer
+from ..state import direct_state_access
+
+class DynamicArrayBuffer(ArrayBuffer):
+    """Array buffer that grows as data is appended.
+
+    The storage holds capacity elements, of which only the first len()
+    are in use and visible through nbytes, shape and the pointers.
+    Capacity grows geometrically, so appending one element at a time is
+    amortized constant.
+
+    Growing keeps the same handle, existing contents are copied out to a
+    scratch buffer and back on the GPU, so pointers and vertex arrays
+    using this buffer stay valid.
+    """
+    _usage = GL.GL_DYNAMIC_DRAW
+    _resizable = True
+
+    def __init__(self, data=None, shape=None, dtype=None, capacity=None, usage=None, growth=2.0):
+        self._capacity = capacity or 0
+        self._growth = growth
+        super(DynamicArrayBuffer, self).__init__(data=data, shape=shape, dtype=dtype, usage=usage)
+
+    @property
+    def _element_nbytes(self):
+        return reduce(lambda x,y: x*y, self._shape[1:], 1) * np.dtype(self._dtype).itemsize
+
+    def _create_storage(self, data):
+        self._capacity = max(self._capacity, self._shape[0], 1)
+        self._allocate_storage(self._capacity * self._element_nbytes)
+        if data is not None and self._nbytes:
+            self.set_data(data)
+
+    def _allocate_storage(self, nbytes):
+        if direct_state_access():
+            GL.glNamedBufferData(self._handle, nbytes, None, self._usage)
+        else:
+            with self:
+                GL.glBufferData(self._target, nbytes, None, self._usage)
+
+    def __len__(self):
+        return self._shape[0]
+
+    def reserve(self, capacity):
+        """Grows the storage to hold at least capacity elements.
+        """
+        if capacity <= self._capacity:
+            return
+        capacity = max(capacity, int(self._capacity * self._growth))
+
+        # re-specifying the storage discards it, keep the contents on the GPU
+        scratch = None
+        if self._nbytes:
+            scratch = CopyWriteBuffer(shape=(self._nbytes,), dtype=np.uint8, usage=GL.GL_STREAM_COPY)
+            self.copy_to(scratch, self._nbytes)
+        self._allocate_storage(capacity * self._element_nbytes)
+        if scratch is not None:
+            scratch.copy_to(self, self._nbytes)
+        self._capacity = capacity
+
+    def resize(self, count):
+        """Sets the number of elements in use, new elements are undefined.
+        """
+        self.reserve(count)
+        self._shape = (count,) + tuple(self._shape[1:])
+        self._nbytes = count * self._element_nbytes
+
+    def extend(self, data):
+        data = np.asarray(data, dtype=self._dtype).reshape((-1,) + tuple(self._shape[1:]))
+        offset = self._nbytes
+        self.resize(len(self) + data.shape[0])
+        self.set_data(data, offset=offset)
+
+    def append(self, value):
+        self.extend([value])
+
+    def clear(self):
+        self.resize(0)
+
+    @property
+    def capacity(self):
+        return self._capacity
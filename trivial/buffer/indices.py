@@ -0,0 +1,57 @@
+import numpy as np
+
+def index_dtype(max_index):
+    """Returns the narrowest unsigned type for indices up to max_index.
+
+    The largest value of each type is left free, as it is the primitive
+    restart index.
+    """
+    if max_index < 0xff:
+        return np.dtype(np.uint8)
+    if max_index < 0xffff:
+        return np.dtype(np.uint16)
+    if max_index < 0xffffffff:
+        return np.dtype(np.uint32)
+    raise ValueError('Index {} is too large'.format(max_index))
+
+def compact_indices(indices):
+    """Returns indices converted to the narrowest type holding them.
+    """
+    indices = np.asarray(indices)
+    if not indices.size:
+        return indices.astype(np.uint8)
+    if indices.min() < 0:
+        raise ValueError('Indices must not be negative')
+    return indices.astype(index_dtype(int(indices.max())), copy=False)
+
+def split_indices(indices, max_vertices=0xffff, primitive_size=3):
+    """Splits indices into chunks referencing at most max_vertices vertices,
+    so large meshes can be drawn with 16 bit indices.
+
+    Returns a list of (vertices, indices), where vertices are the indices
+    of the chunk's vertices in the original vertex data, ie. data[vertices],
+    and indices index into them.
+    """
+    primitives = np.asarray(indices).reshape(-1)
+    if primitives.size % primitive_size or max_vertices < primitive_size:
+        raise ValueError('Invalid parameters')
+    primitives = primitives.reshape(-1, primitive_size)
+
+    chunks = []
+    start = 0
+    while start < len(primitives):
+        vertices = np.empty((0,), dtype=primitives.dtype)
+        end = start
+        # each primitive adds at most primitive_size vertices, add as many
+        # as are sure to fit until the chunk is full
+        while end < len(primitives):
+            room = (max_vertices - len(vertices)) // primitive_size
+            if not room:
+                break
+            vertices = np.union1d(vertices, primitives[end:end + room])
+            end += room
+        end = min(end, len(primitives))
+        local = np.searchsorted(vertices, primitives[start:end]).reshape(-1)
+        chunks.append((vertices, compact_indices(local)))
+        start = end
+    return chunks
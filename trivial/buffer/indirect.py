@@ -0,0 +1,54 @@
+import numpy as np
+
+# layouts of the structs read by glMultiDraw*Indirect
+DrawArraysIndirectCommand = np.dtype([
+    ('count', np.uint32),
+    ('instance_count', np.uint32),
+    ('first', np.uint32),
+    ('base_instance', np.uint32),
+])
+DrawElementsIndirectCommand = np.dtype([
+    ('count', np.uint32),
+    ('instance_count', np.uint32),
+    ('first_index', np.uint32),
+    ('base_vertex', np.int32),
+    ('base_instance', np.uint32),
+])
+
+def _commands(dtype, counts, base_instances, **fields):
+    counts = np.asarray(counts).reshape(-1)
+    commands = np.zeros(counts.shape, dtype=dtype)
+    commands['count'] = counts
+    for name, value in fields.items():
+        commands[name] = value
+    # the draw's index, shaders look up per draw data with gl_BaseInstance
+    # or with instanced attributes
+    commands['base_instance'] = np.arange(len(counts)) if base_instances is None else base_instances
+    return commands
+
+def draw_arrays_commands(counts, firsts=0, instance_counts=1, base_instances=None):
+    """Returns an array of DrawArraysIndirectCommand, one per count, for a
+    DrawIndirectBuffer. The other arguments are scalars or one per draw.
+    base_instances defaults to the index of each draw.
+    """
+    return _commands(DrawArraysIndirectCommand, counts, base_instances,
+                     first=firsts, instance_count=instance_counts)
+
+def draw_elements_commands(counts, first_indices=0, base_vertices=0, instance_counts=1, base_instances=None):
+    """Returns an array of DrawElementsIndirectCommand, see draw_arrays_commands.
+    first_indices count from the start of the index buffer drawn with.
+    """
+    return _commands(DrawElementsIndirectCommand, counts, base_instances,
+                     first_index=first_indices, base_vertex=base_vertices, instance_count=instance_counts)
+
+def commands_for_indices(indices, instance_counts=1, base_instances=None):
+    """Returns the DrawElementsIndirectCommand drawing each of a list of
+    index buffer views, such as allocations from an IndexArena.
+    """
+    return draw_elements_commands(
+        [view.size for view in indices],
+        first_indices=[view.first for view in indices],
+        base_vertices=[view.base_vertex for view in indices],
+        instance_counts=instance_counts,
+        base_instances=base_instances,
+    )
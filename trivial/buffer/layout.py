@@ -0,0 +1,169 @@
+import re
+import numpy as np
+
+# glsl scalar prefixes and types
+_SCALARS = {
+    '': np.float32,
+    'i': np.int32,
+    'u': np.uint32,
+    # booleans are 4 bytes in interface blocks
+    'b': np.int32,
+    'd': np.float64,
+}
+_SCALAR_NAMES = {
+    'float': np.float32,
+    'int': np.int32,
+    'uint': np.uint32,
+    'bool': np.int32,
+    'double': np.float64,
+}
+_re_type = re.compile(r'^(?P<prefix>[iubd]?)(?P<kind>vec|mat)(?P<columns>[234])(x(?P<rows>[234]))?$')
+_re_array = re.compile(r'^(?P<type>\w+)\s*\[(?P<count>\d+)\]$')
+
+def _glsl_type(gtype):
+    """Returns the (dtype, shape) of a glsl type name, matrices are
+    (columns, rows), ie. mat2x3 is (2, 3), arrays of scalars are (count, 1).
+    """
+    gtype = gtype.strip()
+    match = _re_array.match(gtype)
+    if match:
+        dtype, shape = _glsl_type(match.group('type'))
+        return dtype, (int(match.group('count')),) + (shape or (1,))
+
+    if gtype in _SCALAR_NAMES:
+        return _SCALAR_NAMES[gtype], ()
+    match = _re_type.match(gtype)
+    if not match:
+        raise ValueError('Unsupported glsl type {}'.format(gtype))
+
+    dtype = _SCALARS[match.group('prefix')]
+    columns = int(match.group('columns'))
+    if match.group('kind') == 'vec':
+        return dtype, (columns,)
+    rows = int(match.group('rows') or columns)
+    return dtype, (columns, rows)
+
+def _fields(layout):
+    # normalise to a list of (name, scalar type or nested fields, shape)
+    if isinstance(layout, np.dtype):
+        if not layout.names:
+            raise ValueError('Layouts require a structured dtype')
+        fields = []
+        for name in layout.names:
+            field = layout[name]
+            base, shape = field.subdtype if field.subdtype else (field, ())
+            if base.names:
+                fields.append((name, _fields(base), shape))
+            else:
+                fields.append((name, base.type, shape))
+        return fields
+    if hasattr(layout, 'get_vars'):
+        # pyglsl UniformBlock
+        layout = [(var.name, var.gtype) for var in layout.get_vars()]
+
+    fields = []
+    for field in layout:
+        if len(field) == 2 and isinstance(field[1], str):
+            dtype, shape = _glsl_type(field[1])
+            fields.append((field[0], dtype, shape))
+        else:
+            fields.extend(_fields(np.dtype([field])))
+    return fields
+
+def _round(value, alignment):
+    return (value + alignment - 1) // alignment * alignment
+
+def _member(dtype, shape, std140):
+    """Returns the numpy dtype and base alignment of a block member.
+    """
+    if isinstance(dtype, list):
+        # structs are aligned to their largest member
+        struct, alignment = _struct(dtype, std140)
+        return (np.dtype((struct, shape)) if shape else struct), alignment
+
+    size = np.dtype(dtype).itemsize
+    if len(shape) == 0 or (len(shape) == 1 and shape[0] <= 4):
+        # scalar or vector, vec3 is aligned as a vec4
+        components = shape[0] if shape else 1
+        return np.dtype((dtype, shape)), size * (4 if components == 3 else components)
+
+    # arrays, and matrices which are arrays of column vectors
+    if shape[-1] <= 4 and len(shape) >= 2:
+        count, components = shape[:-1], shape[-1]
+    else:
+        count, components = shape, 1
+    alignment = size * (4 if components == 3 else components)
+    if std140:
+        # array elements are padded out to a vec4
+        alignment = _round(alignment, 16)
+    padded = alignment // size
+    return np.dtype((dtype, count + ((padded,) if padded > 1 else ()))), alignment
+
+def _struct(fields, std140):
+    names, formats, offsets = [], [], []
+    offset = 0
+    struct_alignment = 1
+    for name, dtype, shape in fields:
+        member, alignment = _member(dtype, shape, std140)
+        offset = _round(offset, alignment)
+        names.append(name)
+        formats.append(member)
+        offsets.append(offset)
+        offset += member.itemsize
+        struct_alignment = max(struct_alignment, alignment)
+    if std140:
+        struct_alignment = _round(struct_alignment, 16)
+    itemsize = _round(offset, struct_alignment)
+    return np.dtype({'names': names, 'formats': formats, 'offsets': offsets, 'itemsize': itemsize}), struct_alignment
+
+def std140(layout):
+    """Returns a numpy dtype matching the std140 layout of an interface block.
+
+    layout is a structured numpy dtype, a pyglsl UniformBlock or a list of
+    (name, glsl type) such as [('projection', 'mat4'), ('weights', 'float[8]')].
+    Numpy field shapes () are scalars, (n,) vectors, (columns, rows) matrices
+    and (count, ...) arrays.
+
+    Padding is part of the returned dtype, vec3 array elements and matrix
+    columns have 4 components and each element of a float array is a vec4.
+    """
+    return _struct(_fields(layout), std140=True)[0]
+
+def std430(layout):
+    """Returns a numpy dtype matching the std430 layout of a shader storage
+    block, see std140.
+
+    Unlike std140 arrays of scalars and vec2 are tightly packed and structs
+    are only aligned to their largest member.
+    """
+    return _struct(_fields(layout), std140=False)[0]
+
+def aligned(dtype, alignment):
+    """Returns the dtype with its itemsize padded to a multiple of alignment,
+    for arrays of blocks bound by range.
+    """
+    itemsize = _round(dtype.itemsize, alignment)
+    if itemsize == dtype.itemsize:
+        return dtype
+    return np.dtype({
+        'names': dtype.names,
+        'formats': [dtype.fields[name][0] for name in dtype.names],
+        'offsets': [dtype.fields[name][1] for name in dtype.names],
+        'itemsize': itemsize,
+    })
+
+def assign(record, name, value):
+    """Assigns value to a padded field of a layout record, ie. a 3x3 matrix
+    to a mat3 stored as (3, 4), or 8 floats to a float[8] stored as (8, 4).
+    """
+    field = record[name]
+    value = np.asarray(value)
+    if not isinstance(field, np.ndarray):
+        # scalar members are returned as values, not views
+        record[name] = value
+        return
+    if value.shape == field.shape:
+        field[...] = value
+        return
+    value = value.reshape(value.shape + (1,) * (field.ndim - value.ndim))
+    field[tuple(slice(0, n) for n in value.shape)] = value
@@ -0,0 +1,36 @@
+from OpenGL import GL
+from .buffer import VertexBuffer
+
+class PingPongBuffers(object):
+    """Pair of identical buffers, one read while the other is written.
+
+    Suits state advanced on the GPU every frame, such as particles
+    integrated with transform feedback: draw or capture from source into
+    destination, then swap() so the results are the next source.
+    """
+    def __init__(self, data=None, shape=None, dtype=None, usage=GL.GL_DYNAMIC_COPY, buffer_class=VertexBuffer):
+        first = buffer_class(data=data, shape=shape, dtype=dtype, usage=usage)
+        second = buffer_class(shape=first.shape, dtype=first.dtype, usage=usage)
+        self._buffers = [first, second]
+        self._index = 0
+
+    def swap(self):
+        self._index ^= 1
+
+    @property
+    def source(self):
+        return self._buffers[self._index]
+
+    @property
+    def destination(self):
+        return self._buffers[self._index ^ 1]
+
+    @property
+    def buffers(self):
+        return tuple(self._buffers)
+
+    @property
+    def pointers(self):
+        """Pointers to the source buffer.
+        """
+        return self.source.pointers
@@ -0,0 +1,187 @@
+import numpy as np
+from .buffer import VertexBuffer, IndexBuffer
+
+def _byte_range(view, base):
+    # [start, end) bytes of base spanned by a view of it
+    start = end = view.ctypes.data - base.ctypes.data
+    for extent, stride in zip(view.shape, view.strides):
+        if extent == 0:
+            return start, start
+        if stride < 0:
+            start += stride * (extent - 1)
+        else:
+            end += stride * (extent - 1)
+    return start, end + view.itemsize
+
+def _flat_positions(index, shape):
+    # flat indices of the elements an advanced index selects, computed from
+    # the index alone so the cost scales with the elements written
+    if not isinstance(index, tuple):
+        index = (index,)
+    # boolean masks stand for the integer indices of each axis they cover
+    items = []
+    for item in index:
+        if item is None or item is Ellipsis or isinstance(item, slice):
+            items.append(item)
+            continue
+        item = np.asarray(item)
+        items.append(np.nonzero(item) if item.dtype == bool else (item,))
+    used = sum(len(item) if isinstance(item, tuple) else 1
+               for item in items if item is not None and item is not Ellipsis)
+    axes = []
+    for item in items:
+        if item is Ellipsis:
+            axes.extend([slice(None)] * (len(shape) - used))
+        elif isinstance(item, tuple):
+            axes.extend(item)
+        elif item is not None:
+            axes.append(item)
+    axes.extend([slice(None)] * (len(shape) - len(axes)))
+
+    # the advanced indices broadcast together along one dimension, each
+    # slice adds a dimension of its own
+    advanced = iter(np.broadcast_arrays(*[item for item in axes if not isinstance(item, slice)]))
+    sliced = [axis for axis, item in enumerate(axes) if isinstance(item, slice)]
+    ndim = 1 + len(sliced)
+    coordinates = []
+    for axis, item in enumerate(axes):
+        if isinstance(item, slice):
+            dimension = 1 + sliced.index(axis)
+            values = np.arange(*item.indices(shape[axis]))
+        else:
+            dimension = 0
+            values = next(advanced).reshape(-1) % shape[axis]
+        coordinates.append(values.reshape((1,) * dimension + (-1,) + (1,) * (ndim - dimension - 1)))
+    return np.ravel_multi_index(coordinates, shape).reshape(-1)
+
+class ShadowedBufferMixin(object):
+    """Buffer with a CPU copy of its contents.
+
+    Writes through indexing go to the copy and record the byte range they
+    touched. flush() uploads only the dirty ranges, merging ranges closer
+    than gap bytes into a single glBufferSubData call.
+
+    Reads through indexing return read only views of the copy, modify the
+    copy directly with writable(), which marks the range dirty.
+    """
+    def __init__(self, data=None, shape=None, dtype=None, usage=None, gap=256):
+        if data is not None:
+            shadow = np.array(data, dtype=dtype, order='C')
+        else:
+            if shape is None or dtype is None:
+                raise ValueError('Invalid parameters')
+            shadow = np.zeros(shape, dtype=dtype)
+
+        self._shadow = shadow
+        self._shadow_view = shadow.view()
+        self._shadow_view.flags.writeable = False
+        self._dirty = []
+        self.gap = gap
+        self.flushes = 0
+        self.calls = 0
+        self.uploaded = 0
+        super(ShadowedBufferMixin, self).__init__(data=shadow, dtype=shadow.dtype, usage=usage)
+
+    def _view(self, index):
+        # basic indexing with a trailing ellipsis always returns a view
+        if isinstance(index, str):
+            return self._shadow[index]
+        if not isinstance(index, tuple):
+            index = (index,)
+        if Ellipsis not in index:
+            index = index + (Ellipsis,)
+        view = self._shadow[index]
+        if np.may_share_memory(view, self._shadow):
+            return view
+        return None
+
+    def _mark(self, index):
+        view = self._view(index)
+        if view is not None:
+            self._dirty.append(_byte_range(view, self._shadow))
+            return
+
+        # advanced indexing, find the touched elements
+        positions = np.unique(_flat_positions(index, self._shadow.shape)) * self._shadow.itemsize
+        for start in positions.tolist():
+            self._dirty.append((start, start + self._shadow.itemsize))
+
+    def __getitem__(self, index):
+        return self._shadow_view[index]
+
+    def __setitem__(self, index, value):
+        self._shadow[index] = value
+        self._mark(index)
+
+    def writable(self, index=Ellipsis):
+        """Returns a writable view of the copy and marks it dirty.
+        Only valid until the next flush().
+        """
+        view = self._view(index)
+        if view is None:
+            raise ValueError('Only basic indexing returns a writable view')
+        self._dirty.append(_byte_range(view, self._shadow))
+        return view
+
+    def mark_dirty(self, offset=0, nbytes=None):
+        nbytes = nbytes or (self._shadow.nbytes - offset)
+        self._dirty.append((offset, offset + nbytes))
+
+    def _merged_ranges(self):
+        ranges = []
+        for start, end in sorted(self._dirty):
+            if ranges and start <= ranges[-1][1] + self.gap:
+                if end > ranges[-1][1]:
+                    ranges[-1][1] = end
+            else:
+                ranges.append([start, end])
+        return ranges
+
+    def flush(self):
+        """Uploads the dirty ranges of the copy.
+        Returns the number of bytes uploaded.
+        """
+        if not self._dirty:
+            return 0
+
+        data = self._shadow.reshape(-1).view(np.uint8)
+        uploaded = 0
+        for start, end in self._merged_ranges():
+            self.set_data(data[start:end], offset=start)
+            uploaded += end - start
+            self.calls += 1
+        self._dirty = []
+        self.flushes += 1
+        self.uploaded += uploaded
+        return uploaded
+
+    @property
+    def shadow(self):
+        return self._shadow_view
+
+    @property
+    def dirty(self):
+        return bool(self._dirty)
+
+    @property
+    def stats(self):
+        return {
+            'flushes': self.flushes,
+            'calls': self.calls,
+            'uploaded': self.uploaded,
+            # bytes a full set_data per flush would have uploaded
+            'total': self.flushes * self._shadow.nbytes,
+        }
+
+    def reset_stats(self):
+        self.flushes = 0
+        self.calls = 0
+        self.uploaded = 0
+
+class ShadowedVertexBuffer(ShadowedBufferMixin, VertexBuffer):
+    pass
+
+class ShadowedIndexBuffer(ShadowedBufferMixin, IndexBuffer):
+    def __init__(self, data=None, shape=None, dtype=None, usage=None, gap=256):
+        # later writes may index past the initial data, so don't compact it
+        super(ShadowedIndexBuffer, self).__init__(data=data, shape=shape, dtype=dtype or np.uint32, usage=usage, gap=gap)
@@ -0,0 +1,106 @@
+from OpenGL import GL
+import numpy as np
+from .buffer import Buffer, ArrayBufferMixin
+from .buffer_pointer import BufferPointer
+from ..state import direct_state_access
+
+_STORAGE_FLAGS = GL.GL_MAP_WRITE_BIT | GL.GL_MAP_PERSISTENT_BIT | GL.GL_MAP_COHERENT_BIT
+
+class StreamingBuffer(ArrayBufferMixin, Buffer):
+    """Persistently mapped ring buffer for data written every frame.
+
+    The buffer is split into one region per frame in flight. Each frame
+    allocates from the current region, next_frame() fences the region and
+    moves on to the next one, waiting only if the GPU is still using it.
+    Writes to the views returned by allocate() go straight to the buffer.
+
+    Requires GL 4.4 or ARB_buffer_storage.
+    """
+    # immutable storage can't be re-specified by another buffer
+    _recycle = False
+
+    def __init__(self, nbytes, regions=3, alignment=256):
+        if not bool(GL.glBufferStorage):
+            raise ValueError('StreamingBuffer requires glBufferStorage')
+
+        self._region_nbytes = nbytes - (nbytes % alignment)
+        self._regions = regions
+        self._alignment = alignment
+        self._fences = [None] * regions
+        self._region = 0
+        self._head = 0
+        self.stalls = 0
+        super(StreamingBuffer, self).__init__(shape=(self._region_nbytes * regions,), dtype=np.uint8)
+        self._data = self.map(GL.GL_WRITE_ONLY, flags=GL.GL_MAP_PERSISTENT_BIT | GL.GL_MAP_COHERENT_BIT)
+
+    def _create_storage(self, data):
+        if direct_state_access():
+            GL.glNamedBufferStorage(self._handle, self._nbytes, None, _STORAGE_FLAGS)
+        else:
+            with self:
+                GL.glBufferStorage(self._target, self._nbytes, None, _STORAGE_FLAGS)
+
+    def allocate(self, nbytes, dtype=None):
+        """Allocates nbytes from the current frame's region.
+        Returns a writable view of the memory and its offset in the buffer.
+        """
+        offset = -self._head % self._alignment + self._head
+        if offset + nbytes > self._region_nbytes:
+            raise ValueError('Not enough space left in this frame')
+        self._head = offset + nbytes
+
+        offset += self._region * self._region_nbytes
+        view = self._data[offset:offset + nbytes]
+        if dtype is not None:
+            view = view.view(dtype)
+        return view, offset
+
+    def pointers(self, offset, dtype, nbytes=None):
+        """Returns BufferPointers to data of dtype allocated at offset,
+        as a dict for structured dtypes, otherwise a list.
+        """
+        dtype = np.dtype(dtype)
+        if dtype.names:
+            return dict(
+                (name, BufferPointer.for_np_buffer(self, name, dtype=dtype, offset=offset, nbytes=nbytes))
+                for name in dtype.names
+            )
+        return [BufferPointer.for_np_buffer(self, dtype=dtype, offset=offset, nbytes=nbytes)]
+
+    def next_frame(self):
+        """Fences the commands using the current region and moves on to the
+        next one, blocking until the GPU has finished with it.
+        """
+        self._fences[self._region] = GL.glFenceSync(GL.GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+        self._region = (self._region + 1) % self._regions
+        self._head = 0
+
+        fence = self._fences[self._region]
+        if fence is None:
+            return
+        result = GL.glClientWaitSync(fence, 0, 0)
+        if result == GL.GL_TIMEOUT_EXPIRED:
+            self.stalls += 1
+            while result == GL.GL_TIMEOUT_EXPIRED:
+                result = GL.glClientWaitSync(fence, GL.GL_SYNC_FLUSH_COMMANDS_BIT, 1000000)
+        GL.glDeleteSync(fence)
+        self._fences[self._region] = None
+
+    def _destroy(self):
+        for fence in getattr(self, '_fences', ()):
+            if fence is not None:
+                self._deletion_queue.enqueue(GL.glDeleteSync, False, None, fence)
+        self._fences = []
+        super(StreamingBuffer, self)._destroy()
+
+    @property
+    def region(self):
+        return self._region
+
+    @property
+    def region_nbytes(self):
+        return self._region_nbytes
+
+    @property
+    def available(self):
+        return self._region_nbytes - self._head
@@ -0,0 +1,115 @@
+import ctypes
+import numpy as np
+from OpenGL import GL
+from .buffer import PixelUnpackBuffer
+from ..state import deletion_queue
+
+class _Staged(object):
+    # pixels being written into a slot, uploaded when the with block exits
+    def __init__(self, uploader, slot, texture, pixels, format, offset, level):
+        self._uploader = uploader
+        self._slot = slot
+        self._texture = texture
+        self.pixels = pixels
+        self._format = format
+        self._offset = offset
+        self._level = level
+
+    def __enter__(self):
+        return self.pixels
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        shape, dtype = self.pixels.shape, self.pixels.dtype
+        # the array is unusable once unmapped, don't keep it alive
+        self.pixels = None
+        self._uploader._submit(self._slot, self._texture, shape, dtype, self._format, self._offset, self._level,
+                               cancel=exc_type is not None)
+
+class TextureUploader(object):
+    """Uploads texture data through a ring of pixel unpack buffers.
+
+    Pixels are copied into the next free buffer and glTexSubImage* reads
+    them from the buffer, so the copy to the GPU overlaps with rendering
+    instead of stalling the call. A fence marks when each buffer may be
+    written again, stalls counts the uploads that had to wait for one.
+
+    nbytes is the size of each buffer, at least that of the largest upload.
+    """
+    def __init__(self, nbytes, slots=3):
+        self._nbytes = nbytes
+        self._buffers = [PixelUnpackBuffer(shape=(nbytes,), dtype=np.uint8, usage=GL.GL_STREAM_DRAW)
+                         for _ in range(slots)]
+        self._fences = [None] * slots
+        self._slot = 0
+        self._deletion_queue = deletion_queue()
+        self.stalls = 0
+
+    def _next_slot(self):
+        slot = self._slot
+        self._slot = (slot + 1) % len(self._buffers)
+
+        fence = self._fences[slot]
+        if fence is not None:
+            result = GL.glClientWaitSync(fence, 0, 0)
+            if result == GL.GL_TIMEOUT_EXPIRED:
+                self.stalls += 1
+                while result == GL.GL_TIMEOUT_EXPIRED:
+                    result = GL.glClientWaitSync(fence, GL.GL_SYNC_FLUSH_COMMANDS_BIT, 1000000)
+            GL.glDeleteSync(fence)
+            self._fences[slot] = None
+        return slot
+
+    def stage(self, texture, shape, dtype, format=None, offset=None, level=0):
+        """Returns a context whose value is a writable array of shape and
+        dtype in the next buffer, uploaded to texture when the with block
+        exits. Decoding straight into the array avoids a copy.
+        """
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        if nbytes > self._nbytes:
+            raise ValueError('Upload is larger than the buffers')
+
+        slot = self._next_slot()
+        # the fence guarantees the GPU is done with the buffer, don't sync again
+        mapped = self._buffers[slot].map(GL.GL_WRITE_ONLY, nbytes=nbytes,
+                                         flags=GL.GL_MAP_INVALIDATE_BUFFER_BIT | GL.GL_MAP_UNSYNCHRONIZED_BIT)
+        # stays a MappedBuffer, which raises if used after the upload
+        pixels = mapped.view(dtype).reshape(shape)
+        format = format or texture.infer_format(shape, dtype)
+        return _Staged(self, slot, texture, pixels, format, offset, level)
+
+    def upload(self, texture, data, format=None, offset=None, level=0):
+        """Uploads data to texture like texture.set_data.
+        """
+        data = np.asarray(data)
+        with self.stage(texture, data.shape, data.dtype, format, offset, level) as pixels:
+            pixels[...] = data
+
+    def _submit(self, slot, texture, shape, dtype, format, offset, level, cancel=False):
+        buffer = self._buffers[slot]
+        buffer.unmap()
+        if cancel:
+            return
+
+        # bound explicitly, a pixel unpack buffer left bound turns later
+        # uploads from client memory into buffer offsets
+        buffer.bind()
+        try:
+            texture._set_sub_image(ctypes.c_void_p(0), shape, dtype, format, offset, level)
+        finally:
+            buffer.unbind()
+        self._fences[slot] = GL.glFenceSync(GL.GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+
+    def __del__(self):
+        for fence in getattr(self, '_fences', ()):
+            if fence is not None:
+                self._deletion_queue.enqueue(GL.glDeleteSync, False, None, fence)
+        self._fences = []
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    @property
+    def slots(self):
+        return len(self._buffers)
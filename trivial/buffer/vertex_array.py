@@ -1,18 +1,32 @@
-from OpenGL import GL
-from .buffer import IndexBuffer
+import ctypes
+import numpy as np
+from OpenGL import GL, contextdata
+from .buffer import IndexBuffer, DrawIndirectBuffer
+from .indirect import DrawArraysIndirectCommand, DrawElementsIndirectCommand
 from .buffer_pointer import BufferPointer
 from ..object import ManagedObject, BindableObject, UnmanagedObject
+from ..state import direct_state_access, vertex_attrib_binding
 
 
 class VertexArray(BindableObject, ManagedObject):
     _create_func = GL.glGenVertexArrays
     _delete_func = GL.glDeleteVertexArrays
     _bind_func = GL.glBindVertexArray
+    _dsa_create_func = GL.glCreateVertexArrays
+    _pooled = True
 
     def __init__(self):
         super(VertexArray, self).__init__()
         self._pointers = {}
+        # what each location was last specified with, and its element count
+        self._signatures = {}
+        self._formats = {}
+        # (dtype, buffer signature) of each binding of a shared vertex format
+        self._bindings = {}
+        self._sizes = {}
+        self._resizable_locations = set()
         self._count = 0
+        self._resizable = False
 
     def __getitem__(self, index):
         return self._pointers[index]
@@ -24,49 +38,306 @@ class VertexArray(BindableObject, ManagedObject):
         if not isinstance(value, BufferPointer):
             raise ValueError('Requires BufferPointer')
 
-        with self:
-            value.enable(index)
-
-        self._pointers[index] = value
-        self._update_count()
+        if self._signatures.get(index) != value.signature:
+            if direct_state_access():
+                self._enable(index, value)
+            else:
+                with self:
+                    self._enable(index, value)
+        self._set_pointer(index, value)
 
     def __delitem__(self, index):
         if not isinstance(index, int):
             raise ValueError('Indices must be integers')
 
-        with self:
-            GL.glDisableVertexAttribArray(index)
-
-        del self._pointers[index]
-        self._update_count()
+        if direct_state_access():
+            self._disable(index)
+        else:
+            with self:
+                self._disable(index)
 
     def __iter__(self):
-        return self._pointers.keys()
+        return iter(self._pointers.keys())
 
     def __len__(self):
         return len(self._pointers.keys())
 
+    def _enable(self, index, pointer):
+        # the vertex array is bound, unless using direct state access
+        # each location reads from the binding of the same index, a pointer
+        # with an unchanged format only needs its buffer binding replaced
+        previous = self._pointers.get(index)
+        enabled = previous.columns if index in self._signatures else 0
+        changed = self._formats.get(index) != pointer.format_signature
+        # matrices enable a location per column
+        for column in range(pointer.columns, enabled):
+            if direct_state_access():
+                GL.glDisableVertexArrayAttrib(self._handle, index + column)
+            else:
+                GL.glDisableVertexAttribArray(index + column)
+        if direct_state_access():
+            for column in range(enabled, pointer.columns):
+                GL.glEnableVertexArrayAttrib(self._handle, index + column)
+            if changed:
+                pointer.set_format_named(self._handle, index, index)
+            pointer.bind_source_named(self._handle, index)
+        elif vertex_attrib_binding():
+            for column in range(enabled, pointer.columns):
+                GL.glEnableVertexAttribArray(index + column)
+            if changed:
+                pointer.set_format(index, index)
+            pointer.bind_source(index)
+        else:
+            pointer.enable(index)
+        self._signatures[index] = pointer.signature
+        self._formats[index] = pointer.format_signature
+
+    def _disable(self, index):
+        for column in range(self._pointers[index].columns):
+            if direct_state_access():
+                GL.glDisableVertexArrayAttrib(self._handle, index + column)
+            else:
+                GL.glDisableVertexAttribArray(index + column)
+        del self._pointers[index]
+        del self._signatures[index]
+        del self._formats[index]
+        self._update_size(index, None)
+        self._resizable_locations.discard(index)
+        self._resizable = bool(self._resizable_locations)
+
+    def _set_pointer(self, index, pointer):
+        self._pointers[index] = pointer
+        # instanced attributes don't limit the number of vertices
+        self._update_size(index, None if pointer.divisor else pointer.size)
+        # resizable buffers change size after their pointers are set
+        if pointer.buffer._resizable:
+            self._resizable_locations.add(index)
+        else:
+            self._resizable_locations.discard(index)
+        self._resizable = bool(self._resizable_locations)
+
+    def _update_size(self, index, size):
+        # keep the count the smallest size without rescanning every pointer,
+        # unless the smallest pointer was replaced or removed
+        previous = self._sizes.pop(index, None)
+        if size is not None:
+            self._sizes[index] = size
+
+        if not self._sizes:
+            self._count = 0
+        elif previous is not None and previous <= self._count:
+            self._count = min(self._sizes.values())
+        elif size is not None:
+            self._count = size if len(self._sizes) == 1 else min(self._count, size)
+
     def _update_count(self):
-        v = self._pointers.values()
-        self._count = 0 if not v else min(map(lambda x: x.size, v))
+        for index, pointer in self._pointers.items():
+            if not pointer.divisor:
+                self._sizes[index] = pointer.size
+        self._count = min(self._sizes.values()) if self._sizes else 0
+
+    def set_pointers(self, pointers):
+        """Sets the vertex array to the {location: BufferPointer} given.
+        Only the locations whose pointer changed are specified or disabled,
+        with at most one bind of the vertex array.
+        """
+        for value in pointers.values():
+            if not isinstance(value, BufferPointer):
+                raise ValueError('Requires BufferPointer')
+
+        removed = [index for index in self._pointers if index not in pointers]
+        changed = [(index, pointer) for index, pointer in pointers.items()
+                   if self._signatures.get(index) != pointer.signature]
+        if removed or changed:
+            if direct_state_access():
+                self._apply(removed, changed)
+            else:
+                with self:
+                    self._apply(removed, changed)
+
+        for index, pointer in pointers.items():
+            if self._pointers.get(index) is not pointer:
+                self._set_pointer(index, pointer)
+
+    def _apply(self, removed, changed):
+        for index in removed:
+            self._disable(index)
+        for index, pointer in changed:
+            self._enable(index, pointer)
 
     def clear(self):
-        while self._pointers:  # Continue until the dictionary is empty
-            location = next(iter(self._pointers))  # Get the first key
-            del self[location]
+        self.set_pointers({})
+
+    def set_format(self, dtype, locations, binding=0, divisor=0):
+        """Specifies the attributes of a structured vertex dtype once, reading
+        from whichever buffer is bound to binding with bind_vertex_buffer.
+        One vertex array per vertex format can then draw many buffers.
+
+        locations maps field names to attribute locations, ie. a program's
+        attribute_locations, fields without a location are skipped.
+        Bindings are numbered like the locations of pointers set by index,
+        don't mix both on one vertex array.
+        A divisor makes the binding advance per instance rather than vertex.
+        Requires GL 4.3 or ARB_vertex_attrib_binding.
+        """
+        if not vertex_attrib_binding():
+            raise ValueError('Vertex formats require glVertexAttribFormat')
+        dtype = np.dtype(dtype)
+        if not dtype.names:
+            raise ValueError('Vertex formats require a structured dtype')
+
+        formats = dict(
+            (locations[name], BufferPointer.for_np_buffer(None, name, dtype=dtype))
+            for name in dtype.names if locations.get(name) is not None
+        )
+        if direct_state_access():
+            for index, pointer in formats.items():
+                for column in range(pointer.columns):
+                    GL.glEnableVertexArrayAttrib(self._handle, index + column)
+                pointer.set_format_named(self._handle, index, binding)
+            GL.glVertexArrayBindingDivisor(self._handle, binding, divisor)
+        else:
+            with self:
+                for index, pointer in formats.items():
+                    for column in range(pointer.columns):
+                        GL.glEnableVertexAttribArray(index + column)
+                    pointer.set_format(index, binding)
+                GL.glVertexBindingDivisor(binding, divisor)
+        self._bindings[binding] = (dtype, divisor, None)
+
+    def bind_vertex_buffer(self, buffer, binding=0, offset=0):
+        """Sources a vertex format's attributes from buffer, see set_format.
+        Rebinding the buffer already bound is skipped.
+        """
+        dtype, divisor, bound = self._bindings[binding]
+        source = (buffer.handle, buffer.offset + offset, dtype.itemsize)
+        if source != bound:
+            if direct_state_access():
+                GL.glVertexArrayVertexBuffer(self._handle, binding, *source)
+            else:
+                with self:
+                    GL.glBindVertexBuffer(binding, *source)
+            self._bindings[binding] = (dtype, divisor, source)
+        size = None if divisor else (buffer.nbytes - offset) // dtype.itemsize
+        self._update_size(('binding', binding), size)
 
-    def render(self, primitive=GL.GL_TRIANGLES, start=None, count=None):
+    def render(self, primitive=GL.GL_TRIANGLES, start=None, count=None, instances=None, base_instance=0):
+        """Draws count vertices from start, or instances of them when given.
+        base_instance offsets where instanced attributes start reading.
+        """
         start = start or 0
+        if self._resizable:
+            self._update_count()
         count = count or (self._count - start)
         with self:
-            GL.glDrawArrays(primitive, start, int(count))
+            if instances is None:
+                GL.glDrawArrays(primitive, start, int(count))
+            elif base_instance:
+                GL.glDrawArraysInstancedBaseInstance(primitive, start, int(count), instances, base_instance)
+            else:
+                GL.glDrawArraysInstanced(primitive, start, int(count), instances)
 
-    def render_indices(self, indices, primitive=GL.GL_TRIANGLES, start=None, count=None):
+    def render_indices(self, indices, primitive=GL.GL_TRIANGLES, start=None, count=None, instances=None, base_instance=0):
         if not isinstance(indices, IndexBuffer):
             raise ValueError('Indices must be of type IndexBuffer')
 
         with self:
-            indices.render(primitive, start, count)
+            indices.render(primitive, start, count, instances=instances, base_instance=base_instance)
+
+    def render_indirect(self, commands, indices=None, primitive=GL.GL_TRIANGLES, start=None, count=None):
+        """Submits count draws read from a DrawIndirectBuffer in one call.
+
+        commands hold DrawElementsIndirectCommand when drawing indices,
+        otherwise DrawArraysIndirectCommand. Shaders tell the draws apart
+        with gl_DrawID or gl_BaseInstance, which require GL 4.6 or
+        ARB_shader_draw_parameters.
+        """
+        if not isinstance(commands, DrawIndirectBuffer):
+            raise ValueError('Commands must be of type DrawIndirectBuffer')
+        expected = DrawArraysIndirectCommand if indices is None else DrawElementsIndirectCommand
+        if np.dtype(commands.dtype) != expected:
+            raise ValueError('Commands must be of dtype {}'.format(
+                'DrawArraysIndirectCommand' if indices is None else 'DrawElementsIndirectCommand'))
+        if indices is not None and not isinstance(indices, IndexBuffer):
+            raise ValueError('Indices must be of type IndexBuffer')
+
+        start = start or 0
+        count = count or (commands.size - start)
+        offset = ctypes.c_void_p(commands.offset + start * expected.itemsize)
+        with self, commands:
+            if indices is None:
+                GL.glMultiDrawArraysIndirect(primitive, offset, count, expected.itemsize)
+            else:
+                with indices:
+                    GL.glMultiDrawElementsIndirect(primitive, indices.index_type, offset, count, expected.itemsize)
 
 class UnmanagedVertexArray(VertexArray, UnmanagedObject):
-    pass
\ No newline at end of file
+    pass
+
+_CACHE_KEY = 'trivial.vertex_array_cache'
+
+class VertexArrayCache(object):
+    """Vertex arrays of the current context, shared by everything drawing
+    the same {location: BufferPointer} layout and index buffer.
+
+    Entries are reference counted, each acquire must be matched by a
+    release, the vertex array is dropped with its last reference.
+    Entries keep their buffers alive so their handles can't be recycled
+    while a cached vertex array still reads from them.
+    """
+    def __init__(self):
+        self._entries = {}
+        self.created = 0
+        self.reused = 0
+
+    @staticmethod
+    def key(pointers, indices=None):
+        layout = tuple(sorted((location, pointer.signature) for location, pointer in pointers.items()))
+        return layout, (indices.handle if indices is not None else None)
+
+    def acquire(self, pointers, indices=None):
+        """Returns (key, vertex array) for the pointers and index buffer,
+        creating the vertex array the first time the key is seen.
+        """
+        key = self.key(pointers, indices)
+        entry = self._entries.get(key)
+        if entry is None:
+            vertex_array = VertexArray()
+            vertex_array.set_pointers(pointers)
+            entry = self._entries[key] = [vertex_array, 0, pointers, indices]
+            self.created += 1
+        else:
+            self.reused += 1
+        entry[1] += 1
+        return key, entry[0]
+
+    def release(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def stats(self):
+        return {
+            'vertex_arrays': len(self._entries),
+            'created': self.created,
+            'reused': self.reused,
+        }
+
+def vertex_array_cache():
+    """Returns the VertexArrayCache of the current context.
+    """
+    cache = contextdata.getValue(_CACHE_KEY)
+    if cache is None:
+        cache = VertexArrayCache()
+        contextdata.setValue(_CACHE_KEY, cache)
+    return cache
@@ -0,0 +1,137 @@
+import numpy as np
+from .. import dtypes
+
+# formats chosen for float fields whose name ends with the keyword, ie.
+# 'normal', 'a_normal' or 'normal0'
+_DEFAULT_FORMATS = [
+    ('bitangent', 'snorm_2_10_10_10'),
+    ('tangent', 'snorm_2_10_10_10'),
+    ('normal', 'snorm_2_10_10_10'),
+    ('position', 'half'),
+    ('color', 'unorm8'),
+    ('colour', 'unorm8'),
+    ('texcoord', 'unorm16'),
+    ('uv', 'unorm16'),
+]
+_HALF_MAX = float(np.finfo(np.float16).max)
+
+def _default_format(name):
+    name = name.lower().rstrip('0123456789')
+    for keyword, format in _DEFAULT_FORMATS:
+        if name.endswith(keyword):
+            return format
+    return None
+
+def _fits(values, format):
+    """Returns True if format can hold the (count, components) values.
+    """
+    if format == 'snorm_2_10_10_10' and values.shape[-1] not in (3, 4):
+        return False
+    if not values.size:
+        return True
+    if format == 'half':
+        return np.abs(values).max() <= _HALF_MAX
+    if format == 'snorm_2_10_10_10':
+        return np.abs(values).max() <= 1.
+    if format in ('unorm8', 'unorm16'):
+        return values.min() >= 0. and values.max() <= 1.
+    return True
+
+def pack_snorm_2_10_10_10(values):
+    """Packs (..., 3) or (..., 4) values in [-1, 1] into GL_INT_2_10_10_10_REV
+    integers, x, y and z get 10 bits and w, ie. a tangent's handedness, 2.
+    """
+    values = np.asarray(values, dtype=np.float32)
+    if values.shape[-1] not in (3, 4):
+        raise ValueError('Packing requires 3 or 4 components')
+    if values.size and np.abs(values).max() > 1.:
+        raise ValueError('Packed values must be within [-1, 1]')
+    xyz = np.round(values[..., :3] * 511.).astype(np.int32) & 0x3ff
+    packed = xyz[..., 0] | (xyz[..., 1] << 10) | (xyz[..., 2] << 20)
+    if values.shape[-1] == 4:
+        w = np.round(values[..., 3]).astype(np.int32) & 0x3
+        packed = packed | (w << 30)
+    return packed.astype(np.int32)
+
+def unpack_snorm_2_10_10_10(packed):
+    """Returns the (..., 4) float values GL reads from packed integers.
+    """
+    packed = np.asarray(packed).astype(np.int32)
+    # sign extend each component
+    shifts = np.array([22, 12, 2, 0], dtype=np.int32)
+    components = (packed[..., None] << shifts) >> np.array([22, 22, 22, 30], dtype=np.int32)
+    scale = np.array([511., 511., 511., 1.], dtype=np.float32)
+    return np.maximum(components / scale, -1.).astype(np.float32)
+
+def _convert(values, format):
+    """Returns (converted values, their field dtype, values read back by GL).
+    """
+    components = values.shape[1:]
+    if format == 'half':
+        if values.size and np.abs(values).max() > _HALF_MAX:
+            raise ValueError('Values exceed the half float range')
+        converted = values.astype(np.float16)
+        return converted, dtypes.vertex_format(np.float16, components), converted.astype(np.float32)
+    if format == 'snorm_2_10_10_10':
+        packed = pack_snorm_2_10_10_10(values)
+        read = unpack_snorm_2_10_10_10(packed)[..., :components[-1]]
+        return packed, dtypes.vertex_format(np.int32, normalize=True, packed=dtypes.int_2_10_10_10_rev), read
+    if format in ('unorm8', 'unorm16'):
+        if values.size and (values.min() < 0. or values.max() > 1.):
+            raise ValueError('Normalized values must be within [0, 1], use half instead')
+        dtype = np.uint8 if format == 'unorm8' else np.uint16
+        scale = float(np.iinfo(dtype).max)
+        converted = np.round(values * scale).astype(dtype)
+        return converted, dtypes.vertex_format(dtype, components, normalize=True), converted / scale
+    raise ValueError('Unknown vertex format {}'.format(format))
+
+def compact_vertices(data, formats=None):
+    """Converts the float fields of structured vertex data to smaller
+    formats, which pointers made from a buffer of the result read as is.
+
+    formats maps field names to one of
+        'half'              16 bit floats, ie. positions
+        'snorm_2_10_10_10'  3 or 4 components in [-1, 1] packed into 32 bits
+                            as GL_INT_2_10_10_10_REV, ie. normals, tangents
+        'unorm8'            normalized unsigned bytes, ie. colors
+        'unorm16'           normalized unsigned shorts, ie. texture coordinates
+        None                left unchanged
+    Fields not in formats are chosen by name, ie. 'normal' is packed. Values
+    a chosen format can't hold fall back to 'half', ie. tiled texture
+    coordinates or HDR colors, or are left unchanged, only the formats
+    given raise a ValueError.
+
+    Fields are aligned to 4 bytes. Returns (data, errors), where errors maps
+    each converted field to the largest absolute error of its values.
+    """
+    data = np.asarray(data)
+    if not data.dtype.names:
+        raise ValueError('Vertex compaction requires a structured dtype')
+    formats = formats or {}
+
+    names, fields, offsets = [], [], []
+    columns, errors = {}, {}
+    offset = 0
+    for name in data.dtype.names:
+        values = data[name]
+        format = formats[name] if name in formats else _default_format(name)
+        if format is not None and np.issubdtype(values.dtype, np.floating):
+            original = values.reshape(len(values), -1).astype(np.float32)
+            if name not in formats and not _fits(original, format):
+                format = 'half' if _fits(original, 'half') else None
+        if format is None or not np.issubdtype(values.dtype, np.floating):
+            converted, field = values, data.dtype[name]
+        else:
+            converted, field, read = _convert(original, format)
+            errors[name] = float(np.abs(read - original).max()) if original.size else 0.
+        names.append(name)
+        fields.append(field)
+        offsets.append(offset)
+        columns[name] = converted
+        offset += (field.itemsize + 3) // 4 * 4
+
+    dtype = np.dtype({'names': names, 'formats': fields, 'offsets': offsets, 'itemsize': offset})
+    result = np.zeros(len(data), dtype=dtype)
+    for name in names:
+        result[name] = columns[name].reshape(result[name].shape)
+    return result, errors
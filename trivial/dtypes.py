@@ -50,6 +50,9 @@
 from OpenGL import GL
 import numpy as np
 
+# ARB_gpu_shader_int64, not exported by PyOpenGL
+GL_INT64_ARB = 0x140E
+
 class DataType(object):
     def __init__(self, integer, signed, np_type, gl_type, gl_enum, basic_type, char_code=None):
         self._integer = integer
@@ -83,16 +86,43 @@ int16 = DataType(True, True, np.int16, GL.constants.GLshort, GL.GL_SHORT, int)
 uint16 = DataType(True, False, np.uint16, GL.constants.GLushort, GL.GL_UNSIGNED_SHORT, int)
 int32 = DataType(True, True, np.int32, GL.constants.GLint, GL.GL_INT, int, 'i')
 uint32 = DataType(True, False, np.uint32, GL.constants.GLuint, GL.GL_UNSIGNED_INT, int, 'ui')
-int64 = DataType(True, True, np.uint64, GL.constants.GLuint64, GL.GL_UNSIGNED_INT64, int, 'l')
+int64 = DataType(True, True, np.int64, GL.constants.GLint64, GL_INT64_ARB, int, 'l')
 uint64 = DataType(True, False, np.uint64, GL.constants.GLuint64, GL.GL_UNSIGNED_INT64, int, 'ul')
-float16 = DataType(False, True, np.float16, GL.constants.GLhalfARB, GL.GL_HALF_NV, float, 'f16')
+float16 = DataType(False, True, np.float16, GL.constants.GLhalfARB, GL.GL_HALF_FLOAT, float, 'f16')
 float32 = DataType(False, True, np.float32, GL.constants.GLfloat, GL.GL_FLOAT, float, 'f')
 float64 = DataType(False, True, np.float64, GL.constants.GLdouble, GL.GL_DOUBLE, float, 'd')
 
 data_types = [boolean, int8, uint8, int16, uint16, int32, uint32, int64, uint64, float16, float32, float64]
 
+# 3 10 bit components and a 2 bit one packed into 32 bits, read as a vec4
+int_2_10_10_10_rev = DataType(True, True, np.int32, GL.constants.GLint, GL.GL_INT_2_10_10_10_REV, int)
+uint_2_10_10_10_rev = DataType(True, False, np.uint32, GL.constants.GLuint, GL.GL_UNSIGNED_INT_2_10_10_10_REV, int)
+
+# packed types share numpy types with the plain ones, they are chosen by
+# tagging a vertex dtype with vertex_format
+packed_types = [int_2_10_10_10_rev, uint_2_10_10_10_rev]
+
+def vertex_format(dtype, shape=(), normalize=False, packed=None):
+    """Returns a numpy dtype for a vertex attribute which BufferPointer
+    reads as normalized, or as a packed GL type.
+
+    ie. vertex_format(np.uint8, (4,), normalize=True) for colors and
+    vertex_format(np.int32, packed=int_2_10_10_10_rev) for normals.
+    """
+    metadata = {'normalize': normalize}
+    if packed is not None:
+        metadata['packed'] = packed
+    base = np.dtype(dtype, metadata=metadata)
+    return np.dtype((base, shape), metadata=metadata) if shape else base
+
+def vertex_metadata(dtype):
+    """Returns the metadata given to a dtype by vertex_format, or {}.
+    """
+    dtype = np.dtype(dtype)
+    return dtype.metadata or dtype.base.metadata or {}
+
 def for_enum(enum):
-    return dict((int(dtype.gl_enum), dtype) for dtype in data_types)[int(enum)]
+    return dict((int(dtype.gl_enum), dtype) for dtype in data_types + packed_types)[int(enum)]
 
 def for_code(code):
     return dict((str(dtype.char_code), dtype) for dtype in data_types)[str(code)]
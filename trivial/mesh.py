@@ -49,46 +49,69 @@
 
 from OpenGL import GL
 from .object import DescriptorMixin
-from .buffer.vertex_array import VertexArray
+from .buffer.vertex_array import VertexArray, vertex_array_cache
 from .buffer.buffer_pointer import BufferPointer
 
 class Mesh(DescriptorMixin):
-    def __init__(self, pipeline, indices=None, primitive=GL.GL_TRIANGLES, **pointers):
+    def __init__(self, pipeline, indices=None, primitive=GL.GL_TRIANGLES, shared=False, **pointers):
+        """shared meshes take their vertex array from the context's
+        VertexArrayCache, meshes with the same pointers, attribute locations
+        and indices draw with one vertex array. The vertex array of a shared
+        mesh must not be modified, change the mesh's pipeline or indices.
+        """
         self._pointers = pointers
         self._pipeline = pipeline
         self.primitive = primitive
-        self.indices = indices
+        self._indices = indices
 
         for pointer in pointers.values():
             if not isinstance(pointer, BufferPointer):
                 raise ValueError('Must be of type BufferPointer')
 
-        self._vertex_array = VertexArray()
+        self._cache = vertex_array_cache() if shared else None
+        self._cache_key = None
+        self._vertex_array = None if shared else VertexArray()
         self._bind_pointers()
 
-    def _bind_pointers(self):
-        # TODO: make this more efficient, don't just clear all pointers
-        self._vertex_array.clear()
+    def __del__(self):
+        if getattr(self, '_cache_key', None) is not None:
+            self._cache.release(self._cache_key)
+            self._cache_key = None
 
-        # assign our pointers to the vertex array
+    def _bind_pointers(self):
+        # assign our pointers to the vertex array, only the locations that
+        # changed are touched
+        locations = self._pipeline.program.attribute_locations
+        pointers = {}
         for name, pointer in self._pointers.items():
             if not isinstance(pointer, BufferPointer):
                 raise ValueError('Must be a buffer pointer')
 
-            attribute = self._pipeline.program.attributes.get(name)
-            if attribute:
-                self._vertex_array[attribute.location] = pointer
+            location = locations.get(name)
+            if location is not None:
+                pointers[location] = pointer
+
+        if self._cache is None:
+            self._vertex_array.set_pointers(pointers)
+            return
+        # acquire the new vertex array before releasing the old one, in case
+        # it is the same
+        if self._cache_key != self._cache.key(pointers, self._indices):
+            previous = self._cache_key
+            self._cache_key, self._vertex_array = self._cache.acquire(pointers, self._indices)
+            if previous is not None:
+                self._cache.release(previous)
 
-    def draw(self, **uniforms):
+    def draw(self, instances=None, base_instance=0, **uniforms):
         # set our uniforms
         self._pipeline.set_uniforms(**uniforms)
 
         # render
         with self._pipeline:
-            if self.indices is not None:
-                self._vertex_array.render_indices(self.indices, self.primitive)
+            if self._indices is not None:
+                self._vertex_array.render_indices(self._indices, self.primitive, instances=instances, base_instance=base_instance)
             else:
-                self._vertex_array.render(self.primitive)
+                self._vertex_array.render(self.primitive, instances=instances, base_instance=base_instance)
 
     @property
     def pipeline(self):
@@ -99,6 +122,21 @@ class Mesh(DescriptorMixin):
         self._pipeline = pipeline
         self._bind_pointers()
 
+    @property
+    def indices(self):
+        return self._indices
+
+    @indices.setter
+    def indices(self, indices):
+        self._indices = indices
+        self._bind_pointers()
+
     @property
     def vertex_array(self):
-        return self._vertex_array
\ No newline at end of file
+        """The mesh's vertex array, read only if the mesh is shared.
+        """
+        return self._vertex_array
+
+    @property
+    def shared(self):
+        return self._cache is not None
\ No newline at end of file
@@ -47,7 +47,9 @@
 # of the authors and should not be interpreted as representing official policies, 
 # either expressed or implied, of the FreeBSD Project.
 
-from ctypes import c_int
+from ctypes import c_uint
+from functools import partial
+from .state import binding_state, direct_state_access, deletion_queue, handle_pool
 
 class DescriptorMixin(object):
     """Mixin to enable runtime-added descriptors."""
@@ -66,6 +68,17 @@ class DescriptorMixin(object):
             return super(DescriptorMixin, self).__setattr__(name, value)
 
 
+def _arg_count(func):
+    if hasattr(func, 'wrappedOperation'):
+        func = func.wrappedOperation
+    return len(func.argNames)
+
+def _create_array(func, *args):
+    handles = (c_uint * 1)()
+    func(*(args + (1, handles)))
+    return handles[0]
+
+
 class GLObject(object):
     def __init__(self, **kwargs):
         super(GLObject, self).__init__()
@@ -74,47 +87,86 @@ class GLObject(object):
 class ManagedObject(GLObject):
     _create_func = None
     _delete_func = None
+    _dsa_create_func = None
+    _create_call = None
+    _delete_batched = False
+    _dsa_create_call = None
+    # allocate handles in batches from a per context HandlePool
+    _pooled = False
+    # return released handles to the pool instead of deleting them
+    _recycle = False
+    _pool_key = None
+    _dsa_pool_key = None
+
+    def __init_subclass__(cls, **kwargs):
+        super(ManagedObject, cls).__init_subclass__(**kwargs)
+        # resolve the call signatures once per class rather than every call
+        if cls._create_func is not None:
+            count = _arg_count(cls._create_func)
+            if count == 2:
+                cls._create_call = partial(cls._create_func, 1)
+            elif count == 1:
+                cls._create_call = partial(cls._create_func, getattr(cls, '_type', None))
+            else:
+                cls._create_call = cls._create_func
+            cls._pool_key = (cls._create_func,)
+
+        if cls._dsa_create_func is not None:
+            # glCreate* returns objects that exist before they are first bound
+            if _arg_count(cls._dsa_create_func) == 3:
+                cls._dsa_create_call = partial(_create_array, cls._dsa_create_func, cls._target)
+                cls._dsa_pool_key = (cls._dsa_create_func, cls._target)
+            else:
+                cls._dsa_create_call = partial(_create_array, cls._dsa_create_func)
+                cls._dsa_pool_key = (cls._dsa_create_func,)
+
+        if cls._delete_func is not None:
+            # glDelete*(n, handles) can delete many objects in one call
+            cls._delete_batched = _arg_count(cls._delete_func) == 2
 
     def __init__(self, handle=None, dontdelete=False, **kwargs):
         super(ManagedObject, self).__init__(handle=handle, **kwargs)
         self.dontdelete = dontdelete
+        # deletion is deferred to the queue of the context we were created in
+        self._deletion_queue = deletion_queue()
+        self._deletion_queue.auto_flush()
         self._create(handle)
 
     def _create(self, handle):
+        self._handle_pool = None
+        dsa = self._dsa_create_call is not None and direct_state_access()
         if handle:
             self._handle = handle
+        elif self._pooled:
+            self._handle_pool = handle_pool(self._dsa_pool_key if dsa else self._pool_key)
+            self._handle = self._handle_pool.acquire()
+        elif dsa:
+            self._handle = self._dsa_create_call()
         else:
-            func = self._create_func
-            if hasattr(self._create_func, 'wrappedOperation'):
-                func = self._create_func.wrappedOperation
-
-            if len(func.argNames) == 2:
-                self._handle = self._create_func(1)
-            elif len(func.argNames) == 1:
-                self._handle = self._create_func(self._type)
-            else:
-                self._handle = self._create_func()
+            self._handle = self._create_call()
 
     def __del__(self):
         self._destroy()
 
     def _destroy(self):
-        if self.dontdelete:
+        if self.dontdelete or not getattr(self, '_handle', None):
             return
-        func = self._delete_func
-        if hasattr(self._delete_func, 'wrappedOperation'):
-            func = self._delete_func.wrappedOperation
-
-        if len(func.argNames) == 2:
-            try:
-                self._delete_func(1, [self._handle])
-            except TypeError:
-                handle_array = (c_int * 1)(self._handle)
-                self._delete_func(1, handle_array)
-        else:
-            self._delete_func(self._handle)
+        if self._recycle and self._handle_pool is not None:
+            # the handle is recycled at the next flush, when a context is current
+            self._deletion_queue.recycle(self._handle_pool, self._release_call(), self._delete_func,
+                                         self._delete_batched, getattr(self, '_bind_func', None), self._handle)
+            self._handle = None
+            return
+        self._deletion_queue.enqueue(self._delete_func, self._delete_batched,
+                                     getattr(self, '_bind_func', None), self._handle)
         self._handle = None
 
+    def _release_call(self):
+        """Returns a function of the handle which frees the object's storage,
+        it must not reference the object itself.
+        """
+        return None
+
     @property
     def handle(self):
         return self._handle
@@ -132,34 +184,54 @@ class UnmanagedObject(ManagedObject):
 
 
 class BindableObject(GLObject):
-    _bind_function = None
+    _bind_func = None
     _target = None
+    _bind_call = None
+    _binding = None
+
+    def __init_subclass__(cls, **kwargs):
+        super(BindableObject, cls).__init_subclass__(**kwargs)
+        # resolve the call signature and binding state key once per class
+        if cls._bind_func is not None:
+            if _arg_count(cls._bind_func) == 2:
+                cls._bind_call = partial(cls._bind_func, cls._target)
+            else:
+                cls._bind_call = cls._bind_func
+            cls._binding = (cls._bind_func, cls._target, 0)
 
     def __init__(self, **kwargs):
         super(BindableObject, self).__init__(**kwargs)
 
-    def bind(self):
-        func = self._bind_func
-        if hasattr(self._bind_func, 'wrappedOperation'):
-            func = self._bind_func.wrappedOperation
+    def _binding_key(self, state):
+        return self._binding
 
-        if len(func.argNames) == 2:
-            self._bind_func(self._target, self._handle)
-        else:
-            self._bind_func(self._handle)
+    def bind(self):
+        state = binding_state()
+        state.bind(self._binding_key(state), self._handle, self._bind_call)
 
     def unbind(self):
-        func = self._bind_func
-        if hasattr(self._bind_func, 'wrappedOperation'):
-            func = self._bind_func.wrappedOperation
-
-        if len(func.argNames) == 2:
-            self._bind_func(self._target, 0)
-        else:
-            self._bind_func(0)
+        state = binding_state()
+        state.bind(self._binding_key(state), 0, self._bind_call)
 
     def __enter__(self):
+        if self._bind_func is None:
+            self.bind()
+            return
+        state = binding_state()
+        state.push(self._binding_key(state))
         self.bind()
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.unbind()
+        state = binding_state()
+        if self._bind_func is None:
+            if state.unbind_on_exit:
+                self.unbind()
+            return
+        key, previous = state.pop()
+        if not state.unbind_on_exit:
+            return
+        # restore whatever was bound before we entered
+        if previous:
+            state.bind(key, previous, self._bind_call)
+        else:
+            self.unbind()
@@ -48,19 +48,22 @@
 # either expressed or implied, of the FreeBSD Project.
 
 from .object import DescriptorMixin, BindableObject
+from .state import binding_state
 from .texture import Texture
 from .buffer import TextureBuffer
 import numpy as np
 
 class Pipeline(DescriptorMixin, BindableObject):
-    def __init__(self, program, **properties):
+    def __init__(self, program, render_state=None, **properties):
         self._program = program
+        self._render_state = render_state
         self._properties = set(properties.keys())
         for name, value in properties.items():
             setattr(self, name, value)
 
     def __setattr__(self, name, value):
-        if name[0] is not '_':
+        # properties of the pipeline itself are not uniforms
+        if name[0] != '_' and not isinstance(getattr(type(self), name, None), property):
             self._properties.add(name)
         object.__setattr__(self, name, value)
 
@@ -74,20 +77,43 @@ class Pipeline(DescriptorMixin, BindableObject):
         # bind the textures
         uniforms = dict((name, getattr(self, name)) for name in self._properties)
         self.set_uniforms(**uniforms)
+        # only the state that differs from the last pipeline is changed
+        if self._render_state is not None:
+            self._render_state.apply()
         # bind our shader
         self._program.bind()
 
     def unbind(self):
-        # unbind the textures
+        self._unbind_textures()
+        # unbind the shader
+        self._program.unbind()
+
+    def _unbind_textures(self):
         for name in self._properties:
             value = getattr(self, name)
             if isinstance(value, Texture):
                 unit = getattr(self._program, name)
                 if unit is not None:
-                    Texture.active_unit = unit
+                    value.active_unit = unit
                     value.unbind()
-        # unbind the shader
-        self._program.unbind()
+
+    def __enter__(self):
+        state = binding_state()
+        state.push(self._program._binding_key(state))
+        self.bind()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # restore the program bound before we entered rather than unbinding
+        # it, ie. the program capturing transform feedback around a draw
+        state = binding_state()
+        key, previous = state.pop()
+        if not state.unbind_on_exit:
+            return
+        self._unbind_textures()
+        if previous:
+            state.bind(key, previous, self._program._bind_call)
+        else:
+            self._program.unbind()
 
     def set_uniforms(self, **uniforms):
         for name, value in uniforms.items():
@@ -97,7 +123,7 @@ class Pipeline(DescriptorMixin, BindableObject):
                 if isinstance(value, Texture):
                     unit = getattr(self._program, name)
                     if unit is not None:
-                        Texture.active_unit = unit
+                        value.active_unit = unit
                         value.bind()
                 else:
                     setattr(self._program, name, value)
@@ -106,6 +132,14 @@ class Pipeline(DescriptorMixin, BindableObject):
     def program(self):
         return self._program
 
+    @property
+    def render_state(self):
+        return self._render_state
+
+    @render_state.setter
+    def render_state(self, render_state):
+        self._render_state = render_state
+
     @property
     def properties(self):
         return dict((name, getattr(self, name)) for name in self._properties)
@@ -47,18 +47,43 @@
 # of the authors and should not be interpreted as representing official policies, 
 # either expressed or implied, of the FreeBSD Project.
 
-from OpenGL import GL
+from OpenGL import GL, contextdata
 import numpy as np
 
-# TODO: add a cache value that caches mixin that caches the result
+_CACHE_KEY = 'trivial.proxy_cache'
+
+def _context_cache():
+    cache = contextdata.getValue(_CACHE_KEY)
+    if cache is None:
+        cache = {}
+        contextdata.setValue(_CACHE_KEY, cache)
+    return cache
+
+def invalidate_cache(obj=None):
+    """Discards shadowed proxy values.
+
+    Call this when GL state is changed by code outside of trivial.
+    If obj is given, only the values of that object are discarded,
+    otherwise the values of the current context's global state are.
+    """
+    if obj is not None:
+        obj.__dict__.pop('_proxy_cache', None)
+    else:
+        _context_cache().clear()
 
 class Proxy(object):
     """Variable Proxy for OpenGL objects.
+
+    If cache is set the last value read or written is shadowed, reads are
+    served from the shadow and writes of an unchanged value are skipped.
+    Values of proxies that prepend object attributes or bind the object
+    are shadowed per object, all others per context.
     """
     def __init__(self,
         getter=None, getter_args=None,
         setter=None, setter_args=None,
         dtype=None, bind=False, prepend_args=None,
+        cache=False,
     ):
         self._getter = getter
         self._getter_args = getter_args or []
@@ -73,8 +98,48 @@ class Proxy(object):
         self._dtype = dtype
         self._bind = bind
         self._prepend_args = prepend_args or []
+        self._cache = cache
+        self._per_object = bool(self._prepend_args or self._bind)
+
+    def _cache_store(self, obj):
+        if self._per_object:
+            store = obj.__dict__.get('_proxy_cache')
+            if store is None:
+                store = obj.__dict__['_proxy_cache'] = {}
+            return store
+        return _context_cache()
+
+    def _normalize(self, value):
+        # match the form of values returned by _get_result
+        value = np.atleast_1d(np.array(value, dtype=self._dtype))
+        value = [v.item() for v in value.ravel()]
+        if len(value) == 1:
+            value = value[0]
+        return value
 
     def __get__(self, obj, cls):
+        if not self._cache:
+            return self._get(obj, cls)
+
+        store = self._cache_store(obj)
+        try:
+            return store[self]
+        except KeyError:
+            value = store[self] = self._get(obj, cls)
+            return value
+
+    def __set__(self, obj, value):
+        if not self._cache:
+            return self._set(obj, value)
+
+        store = self._cache_store(obj)
+        normalized = self._normalize(value)
+        if self in store and store[self] == normalized:
+            return
+        self._set(obj, value)
+        store[self] = normalized
+
+    def _get(self, obj, cls):
         if not self._getter:
             raise AttributeError('Getting value not supported')
 
@@ -106,7 +171,7 @@ class Proxy(object):
                 value = self._dtype(value)
         return value
 
-    def __set__(self, obj, value):
+    def _set(self, obj, value):
         if not self._setter:
             raise AttributeError('Setting value not supported')
 
@@ -143,15 +208,18 @@ class Float32Proxy(Proxy):
         super(Float32Proxy, self).__init__(*args, **kwargs)
 
 class EnableDisableProxy(Proxy):
-    def __init__(self, arg):
-        super(EnableDisableProxy, self).__init__()
+    def __init__(self, arg, cache=True):
+        super(EnableDisableProxy, self).__init__(cache=cache)
         self._arg = arg
 
-    def __get__(self, obj, cls=None):
+    def _normalize(self, value):
+        return bool(value)
+
+    def _get(self, obj, cls=None):
         with obj:
             return bool(GL.glIsEnabled(self._arg))
 
-    def __set__(self, obj, value):
+    def _set(self, obj, value):
         with obj:
             GL.glEnable(self._arg) if value else GL.glDisable(self._arg)
 
@@ -0,0 +1,95 @@
+# Forked by George Watson (https://github.com/takeiteasy)
+# Copyright (c) 2025.
+# All rights reserved.
+#
+# trivial-graphics
+#
+# Copyright (C) 2025  George Watson
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import ctypes
+from OpenGL import GL
+from OpenGL.raw.GL.VERSION import GL_3_3
+import numpy as np
+from .object import ManagedObject
+
+class Query(ManagedObject):
+    """Asynchronous query of the commands issued between begin() and end(),
+    or within a with block.
+
+    result blocks until the GPU has the answer, check available first to
+    avoid stalling.
+    """
+    _create_func = GL.glGenQueries
+    _delete_func = GL.glDeleteQueries
+    _dsa_create_func = GL.glCreateQueries
+    _target = None
+
+    def __init__(self):
+        super(Query, self).__init__()
+        self._active = False
+
+    def _create(self, handle):
+        super(Query, self)._create(handle)
+        # glGenQueries returns an array even for a single query
+        self._handle = int(np.ravel(self._handle)[0])
+
+    def begin(self):
+        GL.glBeginQuery(self._target, self._handle)
+        self._active = True
+
+    def end(self):
+        GL.glEndQuery(self._target)
+        self._active = False
+
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.end()
+
+    def _get(self, pname):
+        # the wrapped version has no array type for 64 bit results
+        value = ctypes.c_uint64()
+        GL_3_3.glGetQueryObjectui64v(self._handle, pname, ctypes.byref(value))
+        return value.value
+
+    @property
+    def available(self):
+        if self._active:
+            return False
+        return bool(self._get(GL.GL_QUERY_RESULT_AVAILABLE))
+
+    @property
+    def result(self):
+        if self._active:
+            raise ValueError('Query has not ended')
+        return self._get(GL.GL_QUERY_RESULT)
+
+class PrimitivesWrittenQuery(Query):
+    _target = GL.GL_TRANSFORM_FEEDBACK_PRIMITIVES_WRITTEN
+
+class PrimitivesGeneratedQuery(Query):
+    _target = GL.GL_PRIMITIVES_GENERATED
+
+class SamplesPassedQuery(Query):
+    _target = GL.GL_SAMPLES_PASSED
+
+class TimeElapsedQuery(Query):
+    _target = GL.GL_TIME_ELAPSED
+
+__all__ = ['Query', 'PrimitivesWrittenQuery', 'PrimitivesGeneratedQuery', 'SamplesPassedQuery', 'TimeElapsedQuery']
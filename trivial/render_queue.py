@@ -0,0 +1,223 @@
+# Forked by George Watson (https://github.com/takeiteasy)
+# Copyright (c) 2025.
+# All rights reserved.
+#
+# trivial-graphics
+#
+# Copyright (C) 2025  George Watson
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import numpy as np
+from .state import binding_state
+from .render_state import RenderState, fixed_function_state
+from .texture import Texture
+from .buffer import TextureBuffer
+
+# bits of each field of a sort key, from the most significant
+# opaque items sort by state then front to back, transparent ones back to
+# front then by state
+_BUCKET_BITS = 1
+_TARGET_BITS = 7
+_PROGRAM_BITS = 10
+_RENDER_STATE_BITS = 6
+_TEXTURE_BITS = 12
+_VERTEX_ARRAY_BITS = 12
+_DEPTH_BITS = 16
+
+def radix_argsort(keys, digit_bits=16):
+    """Returns the indices which sort unsigned 64 bit keys, least
+    significant digit first with a stable sort per digit.
+    Digits that are equal for every key are skipped.
+    """
+    keys = np.asarray(keys, dtype=np.uint64)
+    order = np.arange(len(keys))
+    mask = np.uint64((1 << digit_bits) - 1)
+    for shift in range(0, 64, digit_bits):
+        digits = ((keys[order] >> np.uint64(shift)) & mask).astype(np.uint16 if digit_bits <= 16 else np.uint32)
+        if not len(digits) or digits.min() == digits.max():
+            continue
+        order = order[np.argsort(digits, kind='stable')]
+    return order
+
+class _Ids(object):
+    """Small integers for the state objects of one key field, in the order
+    they are first seen. Ids wrap around once the field is full, which only
+    costs state changes, not correctness.
+    """
+    def __init__(self, bits):
+        self._ids = {}
+        self._mask = (1 << bits) - 1
+
+    def __getitem__(self, key):
+        value = self._ids.get(key)
+        if value is None:
+            value = self._ids[key] = len(self._ids) & self._mask
+        return value
+
+
+class RenderQueue(object):
+    """Collects draws of meshes and executes them sorted to minimise state
+    changes.
+
+    Each draw is given a 64 bit key made of its bucket, render target,
+    program, render state, textures, vertex array and depth. Opaque draws
+    are grouped by state and drawn front to back within a group,
+    transparent draws are drawn back to front after every opaque one.
+
+    Draws are made through the mesh's vertex array and pipeline with
+    bindings retained, only the state that changed between two draws is
+    set. stats holds the counts of the last execute.
+    """
+    # draws without a render state of their own, or their pipeline's, are
+    # drawn with the GL defaults rather than whatever was applied last
+    default_render_state = RenderState()
+
+    def __init__(self):
+        self._items = []
+        self.stats = {}
+
+    def __len__(self):
+        return len(self._items)
+
+    def submit(self, mesh, depth=0., render_state=None, target=None, transparent=None, instances=None, base_instance=0, **uniforms):
+        """Queues a draw of mesh with the given uniforms, as mesh.draw would.
+
+        depth is the distance from the camera, render_state replaces the
+        pipeline's own for this draw, or default_render_state if neither is
+        given, and target is bound for it, ie. a
+        FrameBufferTexture, None draws to the default framebuffer.
+        Draws are transparent if their render state enables blending,
+        unless transparent is given.
+        """
+        pipeline = mesh.pipeline
+        render_state = render_state or pipeline.render_state or self.default_render_state
+        if transparent is None:
+            transparent = bool(render_state.blend)
+        textures = tuple(value.handle for value in list(pipeline.properties.values()) + list(uniforms.values())
+                         if isinstance(value, (Texture, TextureBuffer)))
+        self._items.append((mesh, pipeline, render_state, target, bool(transparent), float(depth), instances, base_instance, uniforms, textures))
+
+    def clear(self):
+        self._items = []
+
+    def keys(self):
+        """Returns the sort key of each queued draw.
+        """
+        # ids are given per call, objects of past frames are not kept
+        targets = _Ids(_TARGET_BITS)
+        programs = _Ids(_PROGRAM_BITS)
+        render_states = _Ids(_RENDER_STATE_BITS)
+        texture_sets = _Ids(_TEXTURE_BITS)
+        vertex_arrays = _Ids(_VERTEX_ARRAY_BITS)
+        count = len(self._items)
+        fields = np.empty((count, 6), dtype=np.uint64)
+        depths = np.empty(count, dtype=np.float64)
+        for index, (mesh, pipeline, render_state, target, transparent, depth, _, _, _, textures) in enumerate(self._items):
+            fields[index] = (
+                transparent,
+                targets[id(target) if target is not None else None],
+                programs[pipeline.program.handle],
+                render_states[render_state],
+                texture_sets[textures],
+                vertex_arrays[mesh.vertex_array.handle],
+            )
+            depths[index] = depth
+
+        # quantise depths over the range of this frame
+        near, far = (depths.min(), depths.max()) if count else (0., 0.)
+        scale = ((1 << _DEPTH_BITS) - 1) / (far - near) if far > near else 0.
+        depth = ((depths - near) * scale).astype(np.uint64)
+        transparent = fields[:, 0].astype(bool)
+        # back to front is descending depth
+        depth[transparent] = np.uint64((1 << _DEPTH_BITS) - 1) - depth[transparent]
+
+        def pack(columns):
+            key = np.zeros(count, dtype=np.uint64)
+            for values, bits in columns:
+                key = (key << np.uint64(bits)) | values
+            return key
+
+        bucket, target, program, state, texture, vertex_array = fields.T
+        opaque = pack([(bucket, _BUCKET_BITS), (target, _TARGET_BITS), (program, _PROGRAM_BITS),
+                       (state, _RENDER_STATE_BITS), (texture, _TEXTURE_BITS),
+                       (vertex_array, _VERTEX_ARRAY_BITS), (depth, _DEPTH_BITS)])
+        blended = pack([(bucket, _BUCKET_BITS), (target, _TARGET_BITS), (depth, _DEPTH_BITS),
+                        (program, _PROGRAM_BITS), (state, _RENDER_STATE_BITS),
+                        (texture, _TEXTURE_BITS), (vertex_array, _VERTEX_ARRAY_BITS)])
+        return np.where(transparent, blended, opaque)
+
+    def execute(self, sort=True):
+        """Draws and clears the queue, returns the stats of the draws.
+        The render state applied before is restored afterwards, or the
+        default one if it was unknown.
+        """
+        items = self._items
+        if sort and items:
+            items = [items[index] for index in radix_argsort(self.keys())]
+        self._items = []
+
+        stats = dict.fromkeys(('draws', 'target_switches', 'program_switches', 'pipeline_switches',
+                               'render_state_switches', 'texture_switches', 'vertex_array_switches'), 0)
+        current_target = current_pipeline = current_program = current_vertex_array = None
+        current_textures = ()
+        fixed = fixed_function_state()
+        applied = applied_before = fixed.render_state
+        with binding_state().retain_bindings():
+            for mesh, pipeline, render_state, target, _, _, instances, base_instance, uniforms, textures in items:
+                if target is not current_target:
+                    if target is not None:
+                        target.bind()
+                    else:
+                        current_target.unbind()
+                    current_target = target
+                    stats['target_switches'] += 1
+                if pipeline is not current_pipeline:
+                    # binds the pipeline's textures, uniforms and program
+                    pipeline.bind()
+                    current_pipeline = pipeline
+                    stats['pipeline_switches'] += 1
+                    if pipeline.program is not current_program:
+                        current_program = pipeline.program
+                        stats['program_switches'] += 1
+                # the pipeline applies its own state, a draw's state replaces it
+                render_state.apply()
+                if fixed.render_state is not applied:
+                    applied = fixed.render_state
+                    stats['render_state_switches'] += 1
+                if textures != current_textures:
+                    current_textures = textures
+                    stats['texture_switches'] += 1
+                pipeline.set_uniforms(**uniforms)
+
+                vertex_array = mesh.vertex_array
+                if vertex_array is not current_vertex_array:
+                    current_vertex_array = vertex_array
+                    stats['vertex_array_switches'] += 1
+                if mesh.indices is not None:
+                    vertex_array.render_indices(mesh.indices, mesh.primitive, instances=instances, base_instance=base_instance)
+                else:
+                    vertex_array.render(mesh.primitive, instances=instances, base_instance=base_instance)
+                stats['draws'] += 1
+        if current_target is not None:
+            current_target.unbind()
+        if current_pipeline is not None:
+            current_pipeline.unbind()
+        if fixed.render_state is not applied_before:
+            (applied_before or self.default_render_state).apply()
+        self.stats = stats
+        return stats
+
+__all__ = ['RenderQueue', 'radix_argsort']
@@ -0,0 +1,202 @@
+# Forked by George Watson (https://github.com/takeiteasy)
+# Copyright (c) 2025.
+# All rights reserved.
+#
+# trivial-graphics
+#
+# Copyright (C) 2025  George Watson
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from OpenGL import GL, contextdata
+import numpy as np
+from .proxy import Proxy, EnableDisableProxy, invalidate_cache
+
+_APPLIED_KEY = 'trivial.render_state'
+
+class StateProxy(Proxy):
+    """Write only proxy for fixed function state, the elements of the
+    value are passed to the setter as individual arguments.
+    """
+    def __init__(self, setter, dtype=None):
+        super(StateProxy, self).__init__(setter=setter, dtype=dtype, cache=True)
+
+    def _set_args(self, obj, value):
+        return self._setter_args + np.atleast_1d(value).tolist()
+
+
+class FixedFunctionState(object):
+    """The fixed function state of a context, as proxies.
+    """
+    blend = EnableDisableProxy(GL.GL_BLEND)
+    blend_func = StateProxy(GL.glBlendFuncSeparate)
+    blend_equation = StateProxy(GL.glBlendEquationSeparate)
+
+    depth_test = EnableDisableProxy(GL.GL_DEPTH_TEST)
+    depth_func = StateProxy(GL.glDepthFunc)
+    depth_write = StateProxy(GL.glDepthMask, dtype=np.bool)
+
+    cull_face = EnableDisableProxy(GL.GL_CULL_FACE)
+    cull_mode = StateProxy(GL.glCullFace)
+    front_face = StateProxy(GL.glFrontFace)
+
+    stencil_test = EnableDisableProxy(GL.GL_STENCIL_TEST)
+    stencil_func = StateProxy(GL.glStencilFunc)
+    stencil_op = StateProxy(GL.glStencilOp)
+    stencil_write_mask = StateProxy(GL.glStencilMask)
+
+    scissor_test = EnableDisableProxy(GL.GL_SCISSOR_TEST)
+    scissor = StateProxy(GL.glScissor)
+    viewport = StateProxy(GL.glViewport)
+
+    color_mask = StateProxy(GL.glColorMask, dtype=np.bool)
+
+    def __init__(self):
+        self.render_state = None
+        self.changes = 0
+
+    # EnableDisableProxy binds the object it is accessed through
+    def __enter__(self):
+        pass
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+def fixed_function_state():
+    """Returns the FixedFunctionState of the current context.
+    """
+    state = contextdata.getValue(_APPLIED_KEY)
+    if state is None:
+        state = FixedFunctionState()
+        contextdata.setValue(_APPLIED_KEY, state)
+    return state
+
+
+class RenderState(object):
+    """Immutable, hashable block of blend, depth, cull, stencil, scissor and
+    viewport state.
+
+    Applying a state only sets the values that differ from the state
+    previously applied to the context.
+    A value of None leaves that piece of state untouched.
+
+    Defaults are the OpenGL defaults.
+    """
+    _fields = (
+        ('blend', False),
+        ('blend_func', (GL.GL_ONE, GL.GL_ZERO, GL.GL_ONE, GL.GL_ZERO)),
+        ('blend_equation', (GL.GL_FUNC_ADD, GL.GL_FUNC_ADD)),
+        ('depth_test', False),
+        ('depth_func', GL.GL_LESS),
+        ('depth_write', True),
+        ('cull_face', False),
+        ('cull_mode', GL.GL_BACK),
+        ('front_face', GL.GL_CCW),
+        ('stencil_test', False),
+        ('stencil_func', (GL.GL_ALWAYS, 0, 0xFF)),
+        ('stencil_op', (GL.GL_KEEP, GL.GL_KEEP, GL.GL_KEEP)),
+        ('stencil_write_mask', 0xFF),
+        ('scissor_test', False),
+        ('scissor', None),
+        ('viewport', None),
+        ('color_mask', (True, True, True, True)),
+    )
+    _names = tuple(name for name, _ in _fields)
+
+    def __init__(self, **values):
+        unknown = set(values) - set(self._names)
+        if unknown:
+            raise ValueError('Unknown render state {}'.format(', '.join(sorted(unknown))))
+
+        # accept (src, dst) and a single equation for both rgb and alpha
+        blend_func = values.get('blend_func')
+        if blend_func is not None and len(blend_func) == 2:
+            values['blend_func'] = tuple(blend_func) * 2
+        blend_equation = values.get('blend_equation')
+        if blend_equation is not None and not hasattr(blend_equation, '__iter__'):
+            values['blend_equation'] = (blend_equation, blend_equation)
+
+        state = tuple(self._freeze(values.get(name, default)) for name, default in self._fields)
+        object.__setattr__(self, '_values', state)
+        object.__setattr__(self, '_hash', hash(state))
+
+    @staticmethod
+    def _freeze(value):
+        if value is None:
+            return None
+        if hasattr(value, '__iter__'):
+            return tuple(v if isinstance(v, bool) else int(v) for v in value)
+        return value if isinstance(value, bool) else int(value)
+
+    def __getattr__(self, name):
+        try:
+            return self._values[self._names.index(name)]
+        except ValueError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('RenderState is immutable, use replace()')
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        return isinstance(other, RenderState) and self._values == other._values
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return '<{} {}>'.format(self.__class__.__name__, ', '.join(
+            '{}={}'.format(name, value) for name, value in zip(self._names, self._values)))
+
+    def replace(self, **changes):
+        """Returns a copy of this state with the given values changed.
+        """
+        values = dict(zip(self._names, self._values))
+        values.update(changes)
+        return self.__class__(**values)
+
+    def apply(self):
+        """Applies the state to the current context.
+        Returns the number of values that were changed.
+        """
+        state = fixed_function_state()
+        previous = state.render_state
+        if previous is self or previous == self:
+            return 0
+
+        changes = 0
+        for index, name in enumerate(self._names):
+            value = self._values[index]
+            if value is None:
+                continue
+            if previous is not None and previous._values[index] == value:
+                continue
+            setattr(state, name, value)
+            changes += 1
+
+        state.render_state = self
+        state.changes += changes
+        return changes
+
+    @staticmethod
+    def invalidate():
+        """Forget the applied state, call this when GL state is changed by
+        code outside of trivial.
+        """
+        fixed_function_state().render_state = None
+        invalidate_cache()
+
+__all__ = ['RenderState']
@@ -48,6 +48,7 @@
 # either expressed or implied, of the FreeBSD Project.
 
 from .program import Program, UnmanagedProgram
+from .feedback import FeedbackCapture
 from .shader import (ShaderException, Shader, VertexShader, FragmentShader,
                      GeometryShader, TesseleationControlShader,
                      TesselationEvaluationShader, ComputeShader)
@@ -0,0 +1,59 @@
+from OpenGL import GL
+from ..query import PrimitivesWrittenQuery
+
+# vertices written per primitive captured
+_PRIMITIVE_VERTICES = {
+    GL.GL_POINTS: 1,
+    GL.GL_LINES: 2,
+    GL.GL_TRIANGLES: 3,
+}
+
+class FeedbackCapture(object):
+    """Captures the varyings of the draws within a with block into buffers,
+    see Program.capture.
+    """
+    def __init__(self, program, buffers, primitive=GL.GL_POINTS, discard=True, query=True):
+        if primitive not in _PRIMITIVE_VERTICES:
+            raise ValueError('Transform feedback captures GL_POINTS, GL_LINES or GL_TRIANGLES')
+        if not isinstance(buffers, (list, tuple)):
+            buffers = [buffers]
+        self._program = program
+        self._buffers = buffers
+        self.primitive = primitive
+        self.discard = discard
+        self._query = PrimitivesWrittenQuery() if query is True else (query or None)
+
+    def __enter__(self):
+        self._program.__enter__()
+        for index, buffer in enumerate(self._buffers):
+            buffer.bind_range(index, target=GL.GL_TRANSFORM_FEEDBACK_BUFFER)
+        if self.discard:
+            GL.glEnable(GL.GL_RASTERIZER_DISCARD)
+        if self._query is not None:
+            self._query.begin()
+        GL.glBeginTransformFeedback(self.primitive)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        GL.glEndTransformFeedback()
+        if self._query is not None:
+            self._query.end()
+        if self.discard:
+            GL.glDisable(GL.GL_RASTERIZER_DISCARD)
+        self._program.__exit__(exc_type, exc_value, traceback)
+
+    @property
+    def query(self):
+        return self._query
+
+    @property
+    def primitives(self):
+        """Number of primitives written, blocks until the GPU is done.
+        """
+        if self._query is None:
+            raise ValueError('Capture has no query')
+        return self._query.result
+
+    @property
+    def vertices(self):
+        return self.primitives * _PRIMITIVE_VERTICES[self.primitive]
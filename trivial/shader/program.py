@@ -47,14 +47,18 @@
 # of the authors and should not be interpreted as representing official policies,
 # either expressed or implied, of the FreeBSD Project.
 
+import ctypes
 from OpenGL import GL
 import numpy as np
 from .variables import ProgramVariable, Attribute, Uniform
 from ..object import ManagedObject, UnmanagedObject, BindableObject, DescriptorMixin
 from ..proxy import Integer32Proxy
 from ..proxy import Proxy
+from ..state import binding_points
+from OpenGL.raw.GL.VERSION import GL_3_1
 from pyglsl import Stage, VertexStage, FragmentStage
 from .shader import Shader, VertexShader, FragmentShader
+from .feedback import FeedbackCapture
 from typing import Optional, Any
 
 """
@@ -63,11 +67,15 @@ TODO: https://www.opengl.org/registry/specs/ARB/shading_language_include.txt
 TODO: https://www.opengl.org/registry/specs/ARB/sampler_objects.txt
 """
 
+def _supports_storage_blocks():
+    version = (int(GL.glGetIntegerv(GL.GL_MAJOR_VERSION)), int(GL.glGetIntegerv(GL.GL_MINOR_VERSION)))
+    return version >= (4, 3)
+
 class ProgramProxy(Proxy):
-    def __init__(self, property, dtype=None):
+    def __init__(self, property, dtype=None, cache=False):
         super(ProgramProxy, self).__init__(
             getter=GL.glGetProgramiv, getter_args=[property],
-            dtype=dtype, prepend_args=['_handle'],
+            dtype=dtype, prepend_args=['_handle'], cache=cache,
         )
 
 class ProgramUnitProxy(Integer32Proxy):
@@ -106,17 +114,21 @@ class Program(DescriptorMixin, BindableObject, ManagedObject):
     _bind_func = GL.glUseProgram
     _current_program = Integer32Proxy(GL.GL_CURRENT_PROGRAM, bind=False)
 
-    active_attribute_max_length = ProgramProxy(GL.GL_ACTIVE_ATTRIBUTE_MAX_LENGTH)
-    active_attributes = ProgramProxy(GL.GL_ACTIVE_ATTRIBUTES)
-    active_uniform_max_length = ProgramProxy(GL.GL_ACTIVE_UNIFORM_MAX_LENGTH)
-    active_uniforms = ProgramProxy(GL.GL_ACTIVE_UNIFORMS)
-    link_status = ProgramProxy(GL.GL_LINK_STATUS, dtype=np.bool)
+    # fixed once the program is linked
+    active_attribute_max_length = ProgramProxy(GL.GL_ACTIVE_ATTRIBUTE_MAX_LENGTH, cache=True)
+    active_attributes = ProgramProxy(GL.GL_ACTIVE_ATTRIBUTES, cache=True)
+    active_uniform_max_length = ProgramProxy(GL.GL_ACTIVE_UNIFORM_MAX_LENGTH, cache=True)
+    active_uniforms = ProgramProxy(GL.GL_ACTIVE_UNIFORMS, cache=True)
+    active_uniform_blocks = ProgramProxy(GL.GL_ACTIVE_UNIFORM_BLOCKS, cache=True)
+    active_uniform_block_max_name_length = ProgramProxy(GL.GL_ACTIVE_UNIFORM_BLOCK_MAX_NAME_LENGTH, cache=True)
+    link_status = ProgramProxy(GL.GL_LINK_STATUS, dtype=np.bool, cache=True)
     delete_status = ProgramProxy(GL.GL_DELETE_STATUS, dtype=np.bool)
 
-    def __init__(self, handle: Optional[int] = None, shaders: Optional[list[Any]] = None, frag_locations: Optional[str | dict[str, int] | list[str]] = None):
+    def __init__(self, handle: Optional[int] = None, shaders: Optional[list[Any]] = None, frag_locations: Optional[str | dict[str, int] | list[str]] = None, varyings: Optional[list[str]] = None, interleaved: bool = True):
         super(Program, self).__init__()
         self._uniforms = {}
         self._attributes = {}
+        self._varyings = list(varyings or [])
         self._loaded = False
 
         if handle is not None:
@@ -142,8 +154,8 @@ class Program(DescriptorMixin, BindableObject, ManagedObject):
                     self._uniforms |= shader.uniforms
                 elif isinstance(shader, FragmentShader):
                     self._uniforms |= shader.uniforms
-                else:
-                    assert False
+                # other stages, such as compute shaders, come from raw glsl
+                # and declare no variables to pyglsl
             else:
                 raise ValueError("Invalid Shader type")
             self._attach(shader)
@@ -156,38 +168,136 @@ class Program(DescriptorMixin, BindableObject, ManagedObject):
                 frag_locations = { k: i for i, k in enumerate(frag_locations) }
             for name, number in frag_locations:
                 self._set_frag_location(name, number)
+        if self._varyings:
+            self._set_varyings(self._varyings, interleaved)
         self._link()
 
         for shader in detach:
             self._detach(shader)
 
         self._setup_attrs()
+        self._setup_blocks()
         self._loaded = True
     
     def _setup_attrs(self):
+        # unused variables are optimised out, only query the active ones
         if self._attributes:
             store = VariableStore()
-            for i, _ in enumerate(self._attributes.items()):
+            for i in range(self.active_attributes):
                 attr = Attribute(self, i, self.active_attribute_max_length)
+                # built in inputs such as gl_DrawID may be reported as active
+                if attr.name.startswith('gl_'):
+                    continue
                 store[attr.name] = attr
                 self.__dict__[attr.name] = attr
                 GL.glBindAttribLocation(self._handle, i, attr.name)
             self.__dict__['_attributes'] = store
+            # locations are fixed once linked, don't query them on every use
+            self.__dict__['_attribute_locations'] = dict((name, attr.location) for name, attr in store.items())
 
         if self._uniforms:
             store = VariableStore()
-            for i, (name, type) in enumerate(self._uniforms.items()):
+            for i in range(self.active_uniforms):
+                # members of uniform blocks are set through their buffer
+                block = np.empty((1,), dtype=np.int32)
+                GL.glGetActiveUniformsiv(self._handle, 1, np.array([i], dtype=np.uint32), GL.GL_UNIFORM_BLOCK_INDEX, block)
+                if block[0] != -1:
+                    continue
                 uniform = Uniform(self,
                                   i,
                                   self.active_uniform_max_length)
-                store[name] = uniform
+                store[uniform.name] = uniform
                 self.__dict__[uniform.name] = uniform
             self.__dict__['_uniforms'] = store
 
+    def _setup_blocks(self):
+        # give each block the context wide binding point for its name
+        self.__dict__['_uniform_blocks'] = {}
+        points = binding_points(GL.GL_UNIFORM_BUFFER)
+        max_length = self.active_uniform_block_max_name_length
+        for index in range(self.active_uniform_blocks):
+            length = (GL.constants.GLsizei)()
+            name = (GL.constants.GLchar * max_length)()
+            GL_3_1.glGetActiveUniformBlockName(self._handle, index, max_length, length, name)
+            name = name.value.decode()
+            self._uniform_blocks[name] = index
+            GL.glUniformBlockBinding(self._handle, index, points[name])
+
+        self.__dict__['_storage_blocks'] = {}
+        if not _supports_storage_blocks():
+            return
+        points = binding_points(GL.GL_SHADER_STORAGE_BUFFER)
+        max_length = self._storage_block_query(GL.GL_MAX_NAME_LENGTH)
+        for index in range(self._storage_block_query(GL.GL_ACTIVE_RESOURCES)):
+            length = (GL.constants.GLsizei)()
+            name = (GL.constants.GLchar * max_length)()
+            GL.glGetProgramResourceName(self._handle, GL.GL_SHADER_STORAGE_BLOCK, index, max_length, length, name)
+            name = name.value.decode()
+            self._storage_blocks[name] = index
+            GL.glShaderStorageBlockBinding(self._handle, index, points[name])
+
+    def _storage_block_query(self, pname):
+        value = np.empty((1,), dtype=np.int32)
+        GL.glGetProgramInterfaceiv(self._handle, GL.GL_SHADER_STORAGE_BLOCK, pname, value)
+        return int(value[0])
+
+    def dispatch(self, x, y=1, z=1, barrier=GL.GL_SHADER_STORAGE_BARRIER_BIT):
+        """Runs the program's compute shader over x * y * z work groups.
+        barrier is passed to glMemoryBarrier afterwards, so later commands
+        see the shader's writes, use 0 for none.
+        """
+        with self:
+            GL.glDispatchCompute(x, y, z)
+        if barrier:
+            GL.glMemoryBarrier(barrier)
+
+    def capture(self, buffers, primitive=GL.GL_POINTS, discard=True, query=True):
+        """Returns a context capturing the program's varyings into buffers
+        while drawing within it.
+
+        The varyings are written interleaved into one buffer, or one buffer
+        each when linked with interleaved=False. discard skips rasterization.
+        query is True for a new PrimitivesWrittenQuery, an existing query to
+        reuse, or False, the count is then the capture's primitives.
+        """
+        if not self._varyings:
+            raise ValueError('Program was linked without varyings')
+        return FeedbackCapture(self, buffers, primitive, discard, query)
+
+    def bind_uniform_block(self, name, point):
+        """Binds a uniform block to a binding point other than the one
+        allocated for its name.
+        """
+        GL.glUniformBlockBinding(self._handle, self._uniform_blocks[name], point)
+
+    def bind_storage_block(self, name, point):
+        """Binds a shader storage block to a binding point other than the
+        one allocated for its name.
+        """
+        GL.glShaderStorageBlockBinding(self._handle, self._storage_blocks[name], point)
+
+    @property
+    def uniform_blocks(self):
+        return self.__dict__.get('_uniform_blocks', {})
+
+    @property
+    def varyings(self):
+        return list(self._varyings)
+
+    @property
+    def storage_blocks(self):
+        return self.__dict__.get('_storage_blocks', {})
+
     @property
     def attributes(self):
         return self._attributes
 
+    @property
+    def attribute_locations(self):
+        """{name: location} of the active attributes.
+        """
+        return self.__dict__.get('_attribute_locations', {})
+
     @property
     def uniforms(self):
         return self._uniforms
@@ -243,5 +353,11 @@ class Program(DescriptorMixin, BindableObject, ManagedObject):
     def _set_frag_location(self, name, number):
         GL.glBindFragDataLocation(self._handle, number, name)
 
+    def _set_varyings(self, varyings, interleaved):
+        strings = [ctypes.create_string_buffer(name.encode('utf-8')) for name in varyings]
+        names = (ctypes.POINTER(ctypes.c_char) * len(strings))(*[ctypes.cast(string, ctypes.POINTER(ctypes.c_char)) for string in strings])
+        mode = GL.GL_INTERLEAVED_ATTRIBS if interleaved else GL.GL_SEPARATE_ATTRIBS
+        GL.glTransformFeedbackVaryings(self._handle, len(varyings), names, mode)
+
 class UnmanagedProgram(Program, UnmanagedObject):
     pass
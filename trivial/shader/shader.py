@@ -58,10 +58,10 @@ import re
 import textwrap
 
 class ShaderProxy(Proxy):
-    def __init__(self, property, dtype=None):
+    def __init__(self, property, dtype=None, cache=False):
         super(ShaderProxy, self).__init__(
             getter=GL.glGetShaderiv, getter_args=[property],
-            dtype=dtype, prepend_args=['_handle']
+            dtype=dtype, prepend_args=['_handle'], cache=cache,
         )
 
 
@@ -130,9 +130,10 @@ class Shader(ManagedObject):
     _create_func = GL.glCreateShader
     _delete_func = GL.glDeleteShader
 
-    compile_status = ShaderProxy(GL.GL_COMPILE_STATUS, dtype=np.bool)
+    # fixed once the shader is compiled
+    compile_status = ShaderProxy(GL.GL_COMPILE_STATUS, dtype=np.bool, cache=True)
     delete_status = ShaderProxy(GL.GL_DELETE_STATUS, dtype=np.bool)
-    source_length = ShaderProxy(GL.GL_SHADER_SOURCE_LENGTH)
+    source_length = ShaderProxy(GL.GL_SHADER_SOURCE_LENGTH, cache=True)
 
     @classmethod
     def open(cls, filename):
@@ -219,9 +220,12 @@ class WrappedShader(Shader, Generic[ShaderStage]):
         source = self.source.decode('utf-8')
         self._attributes = {}
         for line in source.split('\n'):
+            # layout qualifiers may contain spaces, drop them first
+            line = re.sub(r'layout\s*\([^)]*\)', '', line)
             p = [x for x in line.lstrip().split(' ') if x]
-            if p:
-                if p[0] == "in" or p[0].startswith("layout"):
+            # interface blocks are not variables
+            if p and not p[-1].endswith('{'):
+                if p[0] == "in":
                     self._attributes[p[-1][:-1]] = p[-2]
                 elif p[0] == "uniform":
                     self._uniforms[p[-1][:-1]] = p[-2]
@@ -55,6 +55,7 @@ from OpenGL.raw.GL.VERSION import GL_2_0
 import numpy as np
 from . import enumerations
 from .. import dtypes
+from ..state import direct_state_access
 
 class ProgramVariable(object):
     def __init__(self, program, index, max_length):
@@ -213,6 +214,9 @@ class Uniform(ProgramVariable):
             self._get_value_func = getattr(GL, get_func_string)
             self._set_value_func = getattr(GL, set_func_string)
 
+        # glProgramUniform{size}{type}v sets the value without binding the program
+        self._set_program_value_func = getattr(GL, 'glProgram' + set_func_string[2:])
+
     def _element_offset(self):
         """OpenGL stores each uniform value in a 32 byte location.
         Data structures smaller than this (vec2, vec3, sampler2D, etc) will still
@@ -238,10 +242,18 @@ class Uniform(ProgramVariable):
     def _set_data(self, location, value):
         value = np.array(value, dtype=self._dtype)
         count = int(value.nbytes / self.itemsize)
-        if self._is_matrix:
-            self._set_value_func(location, count, False, value)  # type: ignore
-        else:
-            self._set_value_func(location, count, value)  # type: ignore
+        if direct_state_access():
+            if self._is_matrix:
+                self._set_program_value_func(self._program.handle, location, count, False, value)
+            else:
+                self._set_program_value_func(self._program.handle, location, count, value)
+            return
+
+        with self._program:
+            if self._is_matrix:
+                self._set_value_func(location, count, False, value)  # type: ignore
+            else:
+                self._set_value_func(location, count, value)  # type: ignore
 
     def _get_data(self, location):
         count = reduce(lambda x,y: x*y, self._dimensions)
@@ -310,8 +322,7 @@ class Uniform(ProgramVariable):
         else:
             raise ValueError('Unsupported indexing method')
 
-        with self._program:
-            self._set_data(self.location + (index.start * self._element_offset()), value)
+        self._set_data(self.location + (index.start * self._element_offset()), value)
 
     @property
     def data(self):
@@ -319,5 +330,4 @@ class Uniform(ProgramVariable):
 
     @data.setter
     def data(self, value):
-        with self._program:
-            self._set_data(self.location, value)
+        self._set_data(self.location, value)
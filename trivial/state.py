@@ -0,0 +1,445 @@
+# Forked by George Watson (https://github.com/takeiteasy)
+# Copyright (c) 2025.
+# All rights reserved.
+#
+# trivial-graphics
+#
+# Copyright (C) 2025  George Watson
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from contextlib import contextmanager
+from OpenGL import GL, contextdata, extensions
+import numpy as np
+
+_STATE_KEY = 'trivial.binding_state'
+_DSA_KEY = 'trivial.direct_state_access'
+_DELETION_KEY = 'trivial.deletion_queue'
+_POOLS_KEY = 'trivial.handle_pools'
+_BINDING_POINTS_KEY = 'trivial.binding_points'
+_ATTRIB_BINDING_KEY = 'trivial.vertex_attrib_binding'
+
+# the element buffer binding is part of the vertex array object state
+_ELEMENT_BUFFER_KEY = (GL.glBindBuffer, GL.GL_ELEMENT_ARRAY_BUFFER, 0)
+
+class BindingState(object):
+    """Shadow of the objects bound to each target of a single GL context.
+
+    Bindings are keyed by (bind function, target, texture unit), so buffer
+    targets, the vertex array, the program, each texture unit + target and
+    the framebuffer are all tracked independently.
+    Binding an object that is already bound is skipped.
+
+    Any GL code that binds objects behind our back must call invalidate().
+    """
+    def __init__(self):
+        self._bindings = {}
+        self._element_buffers = {}
+        self._stack = []
+        self._active_unit = None
+        self.unbind_on_exit = True
+        self.issued = 0
+        self.elided = 0
+
+    def bound(self, key):
+        """Returns the handle bound to key, or None if it is unknown.
+        """
+        return self._bindings.get(key)
+
+    def bind(self, key, handle, func):
+        if self._bindings.get(key) == handle:
+            self.elided += 1
+            return False
+
+        if key[0] is GL.glBindVertexArray:
+            self._swap_element_buffer(self._bindings.get(key), handle)
+
+        func(handle)
+        self.issued += 1
+        self._bindings[key] = handle
+        return True
+
+    def _swap_element_buffer(self, previous, handle):
+        # each vertex array remembers its own element buffer
+        element_buffer = self._bindings.pop(_ELEMENT_BUFFER_KEY, None)
+        if previous is not None and element_buffer is not None:
+            self._element_buffers[previous] = element_buffer
+        element_buffer = self._element_buffers.get(handle)
+        if element_buffer is not None:
+            self._bindings[_ELEMENT_BUFFER_KEY] = element_buffer
+
+    def set_bound(self, key, handle):
+        """Records a binding made as a side effect of another GL call.
+        """
+        self._bindings[key] = handle
+
+    def push(self, key):
+        self._stack.append((key, self._bindings.get(key)))
+
+    def pop(self):
+        return self._stack.pop()
+
+    def forget(self, func, handle):
+        """Called when an object is deleted, GL implicitly unbinds it
+        from any target it was bound to.
+        """
+        for key, bound in list(self._bindings.items()):
+            if key[0] is func and bound == handle:
+                if func is GL.glBindVertexArray:
+                    self._swap_element_buffer(None, 0)
+                self._bindings[key] = 0
+
+        if func is GL.glBindVertexArray:
+            self._element_buffers.pop(handle, None)
+        elif func is GL.glBindBuffer:
+            # indexed bindings are (handle, offset, size)
+            for key, bound in list(self._bindings.items()):
+                if key[0] is GL.glBindBufferRange and bound[0] == handle:
+                    del self._bindings[key]
+            # other vertex arrays keep referencing the orphaned storage
+            for vertex_array, element_buffer in list(self._element_buffers.items()):
+                if element_buffer == handle:
+                    del self._element_buffers[vertex_array]
+
+    @property
+    def active_unit(self):
+        if self._active_unit is None:
+            self._active_unit = int(GL.glGetIntegerv(GL.GL_ACTIVE_TEXTURE)) - GL.GL_TEXTURE0
+        return self._active_unit
+
+    @active_unit.setter
+    def active_unit(self, unit):
+        if self._active_unit == unit:
+            self.elided += 1
+            return
+        GL.glActiveTexture(GL.GL_TEXTURE0 + unit)
+        self.issued += 1
+        self._active_unit = unit
+
+    def invalidate(self):
+        """Forget all known bindings, the next bind of each target is issued.
+        """
+        self._bindings.clear()
+        self._element_buffers.clear()
+        self._active_unit = None
+
+    @contextmanager
+    def retain_bindings(self):
+        """Leave objects bound when their `with` block exits.
+
+        Useful for hot loops that repeatedly draw with the same objects,
+        consecutive binds of the same object are then elided.
+        """
+        previous = self.unbind_on_exit
+        self.unbind_on_exit = False
+        try:
+            yield self
+        finally:
+            self.unbind_on_exit = previous
+
+    @property
+    def stats(self):
+        return {'issued': self.issued, 'elided': self.elided}
+
+    def reset_stats(self):
+        self.issued = 0
+        self.elided = 0
+
+def binding_state():
+    """Returns the BindingState of the current context.
+    """
+    state = contextdata.getValue(_STATE_KEY)
+    if state is None:
+        state = BindingState()
+        contextdata.setValue(_STATE_KEY, state)
+    return state
+
+class DeletionQueue(object):
+    """Deferred deletion of the GL objects of a single context.
+
+    Objects are only enqueued when they are garbage collected, which may
+    happen with no context current or from another thread.
+    The queue is flushed at a safe point, at the end of each frame by
+    end_frame() or explicitly with flush(), with one glDelete* call per
+    object type. Applications that never call either are still bounded,
+    the queue is also flushed when a new object is created and more than
+    flush_threshold handles are pending.
+    """
+    def __init__(self, flush_threshold=1024):
+        self._pending = {}
+        self._recycled = []
+        self._count = 0
+        self.flush_threshold = flush_threshold
+        self.deleted = 0
+        self.recycled = 0
+        self.calls = 0
+
+    def __len__(self):
+        return self._count
+
+    def enqueue(self, func, batched, bind_func, handle):
+        self._pending.setdefault((func, batched, bind_func), []).append(handle)
+        self._count += 1
+
+    def recycle(self, pool, release, func, batched, bind_func, handle):
+        """Returns handle to pool on the next flush, once release(handle) has
+        freed the storage it still holds. Handles the pool has no room for
+        are deleted instead.
+        """
+        self._recycled.append((pool, release, (func, batched, bind_func), handle))
+        self._count += 1
+
+    def auto_flush(self):
+        """Flushes the queue once flush_threshold handles are pending, the
+        queue's context must be current.
+        """
+        if self._count >= self.flush_threshold:
+            self.flush()
+
+    def flush(self):
+        """Deletes all pending objects, the queue's context must be current.
+        """
+        pending, self._pending = self._pending, {}
+        recycled, self._recycled = self._recycled, []
+        self._count = 0
+        for pool, release, key, handle in recycled:
+            if release is not None:
+                release(handle)
+            if pool.release(handle):
+                self.recycled += 1
+            else:
+                pending.setdefault(key, []).append(handle)
+        state = binding_state()
+        for (func, batched, bind_func), handles in pending.items():
+            if bind_func is not None:
+                for handle in handles:
+                    state.forget(bind_func, handle)
+            if batched:
+                func(len(handles), np.array(handles, dtype=np.uint32))
+                self.calls += 1
+            else:
+                for handle in handles:
+                    func(handle)
+                self.calls += len(handles)
+            self.deleted += len(handles)
+
+    @property
+    def stats(self):
+        return {'pending': self._count, 'deleted': self.deleted, 'recycled': self.recycled, 'calls': self.calls}
+
+    def reset_stats(self):
+        self.deleted = 0
+        self.recycled = 0
+        self.calls = 0
+
+def deletion_queue():
+    """Returns the DeletionQueue of the current context.
+    """
+    queue = contextdata.getValue(_DELETION_KEY)
+    if queue is None:
+        queue = DeletionQueue()
+        contextdata.setValue(_DELETION_KEY, queue)
+    return queue
+
+def end_frame():
+    """Marks the end of a frame in the current context, call it after the
+    frame's last draw, ie. before swapping buffers.
+
+    Deletes the GL objects released during the frame, rather than when
+    enough are pending.
+    """
+    deletion_queue().flush()
+
+class HandlePool(object):
+    """Handles of a single object type, allocated in batches.
+
+    Calling glGen*(1) / glCreate*(1) per object is a round trip through
+    PyOpenGL each time, the pool instead allocates batch_size handles at once.
+    Released handles are kept, up to max_recycled, and handed out again
+    before any fresh ones.
+    """
+    def __init__(self, create_func, args=(), batch_size=256, max_recycled=4096):
+        self._create_func = create_func
+        self._args = tuple(args)
+        self._free = []
+        self._recycled = []
+        self.batch_size = batch_size
+        self.max_recycled = max_recycled
+        self.allocated = 0
+        self.batches = 0
+        self.acquired = 0
+        self.reused = 0
+
+    def _allocate(self, count):
+        handles = np.empty((count,), dtype=np.uint32)
+        self._create_func(*(self._args + (count, handles)))
+        # pop from the end, hand out the lowest handles first
+        self._free.extend(handles[::-1].tolist())
+        self.allocated += count
+        self.batches += 1
+
+    def acquire(self):
+        self.acquired += 1
+        if self._recycled:
+            self.reused += 1
+            return self._recycled.pop()
+        if not self._free:
+            self._allocate(self.batch_size)
+        return self._free.pop()
+
+    def release(self, handle):
+        """Returns the handle to the pool.
+        Returns False if the pool is full and the handle must be deleted.
+        """
+        if len(self._recycled) >= self.max_recycled:
+            return False
+        self._recycled.append(handle)
+        return True
+
+    def reserve(self, count):
+        """Pre-allocate at least count handles in a single batch.
+        """
+        count -= len(self._free) + len(self._recycled)
+        if count > 0:
+            self._allocate(count)
+
+    @property
+    def stats(self):
+        return {
+            'allocated': self.allocated,
+            'batches': self.batches,
+            'acquired': self.acquired,
+            'reused': self.reused,
+            'free': len(self._free),
+            'recycled': len(self._recycled),
+        }
+
+def handle_pool(key):
+    """Returns the HandlePool of the current context for key.
+
+    key is the create function followed by any leading arguments, ie.
+    (glGenBuffers,) or (glCreateTextures, GL_TEXTURE_2D).
+    """
+    pools = contextdata.getValue(_POOLS_KEY)
+    if pools is None:
+        pools = {}
+        contextdata.setValue(_POOLS_KEY, pools)
+    pool = pools.get(key)
+    if pool is None:
+        pool = pools[key] = HandlePool(key[0], key[1:])
+    return pool
+
+class BindingPoints(object):
+    """Binding point indices of named interface blocks for one indexed
+    buffer target, ie. GL_UNIFORM_BUFFER.
+
+    Each block name is given its own binding point the first time it is
+    seen, so every program declaring a block and the buffer backing it
+    agree on the index without it being hard coded.
+    """
+    def __init__(self, limit):
+        self._points = {}
+        self.limit = limit
+
+    def __getitem__(self, name):
+        point = self._points.get(name)
+        if point is None:
+            point = len(self._points)
+            if point >= self.limit:
+                raise ValueError('Out of binding points for {}'.format(name))
+            self._points[name] = point
+        return point
+
+    def __setitem__(self, name, point):
+        self._points[name] = point
+
+    def __contains__(self, name):
+        return name in self._points
+
+# the limit of binding points of each indexed target
+_BINDING_LIMITS = {
+    GL.GL_UNIFORM_BUFFER: GL.GL_MAX_UNIFORM_BUFFER_BINDINGS,
+    GL.GL_SHADER_STORAGE_BUFFER: GL.GL_MAX_SHADER_STORAGE_BUFFER_BINDINGS,
+    GL.GL_TRANSFORM_FEEDBACK_BUFFER: GL.GL_MAX_TRANSFORM_FEEDBACK_BUFFERS,
+    GL.GL_ATOMIC_COUNTER_BUFFER: GL.GL_MAX_ATOMIC_COUNTER_BUFFER_BINDINGS,
+}
+
+def binding_points(target):
+    """Returns the BindingPoints of the current context for an indexed target.
+    """
+    targets = contextdata.getValue(_BINDING_POINTS_KEY)
+    if targets is None:
+        targets = {}
+        contextdata.setValue(_BINDING_POINTS_KEY, targets)
+    points = targets.get(target)
+    if points is None:
+        limit = int(GL.glGetIntegerv(_BINDING_LIMITS[target]))
+        points = targets[target] = BindingPoints(limit)
+    return points
+
+def _supports_direct_state_access():
+    version = (int(GL.glGetIntegerv(GL.GL_MAJOR_VERSION)), int(GL.glGetIntegerv(GL.GL_MINOR_VERSION)))
+    if version >= (4, 5):
+        return True
+    return bool(extensions.hasGLExtension('GL_ARB_direct_state_access'))
+
+def direct_state_access():
+    """Returns True if objects in the current context should be edited
+    through the GL 4.5 direct state access functions instead of binding them.
+
+    This is detected the first time it is called for each context.
+    """
+    enabled = contextdata.getValue(_DSA_KEY)
+    if enabled is None:
+        enabled = _supports_direct_state_access()
+        contextdata.setValue(_DSA_KEY, enabled)
+    return enabled
+
+def set_direct_state_access(enabled):
+    """Force the direct state access backend on or off for the current context.
+    """
+    if enabled and not _supports_direct_state_access():
+        raise ValueError('Direct state access is not supported by this context')
+    contextdata.setValue(_DSA_KEY, bool(enabled))
+
+def _supports_vertex_attrib_binding():
+    version = (int(GL.glGetIntegerv(GL.GL_MAJOR_VERSION)), int(GL.glGetIntegerv(GL.GL_MINOR_VERSION)))
+    if version >= (4, 3):
+        return True
+    return bool(extensions.hasGLExtension('GL_ARB_vertex_attrib_binding'))
+
+def vertex_attrib_binding():
+    """Returns True if vertex attribute formats are specified separately
+    from the buffers they read, with glVertexAttribFormat and
+    glBindVertexBuffer, in the current context.
+
+    This is detected the first time it is called for each context.
+    """
+    enabled = contextdata.getValue(_ATTRIB_BINDING_KEY)
+    if enabled is None:
+        enabled = _supports_vertex_attrib_binding()
+        contextdata.setValue(_ATTRIB_BINDING_KEY, enabled)
+    return enabled
+
+def set_vertex_attrib_binding(enabled):
+    """Force separate vertex formats on or off for the current context.
+    """
+    if enabled and not _supports_vertex_attrib_binding():
+        raise ValueError('Vertex attribute binding is not supported by this context')
+    contextdata.setValue(_ATTRIB_BINDING_KEY, bool(enabled))
+
+__all__ = ['BindingState', 'binding_state', 'DeletionQueue', 'deletion_queue', 'end_frame',
+           'HandlePool', 'handle_pool', 'BindingPoints', 'binding_points',
+           'direct_state_access', 'set_direct_state_access',
+           'vertex_attrib_binding', 'set_vertex_attrib_binding']
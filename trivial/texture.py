@@ -53,6 +53,7 @@ import numpy as np
 from . import dtypes
 from .proxy import Proxy, Integer32Proxy
 from .object import ManagedObject, BindableObject, DescriptorMixin, UnmanagedObject
+from .state import binding_state, direct_state_access
 from PIL import Image
 from typing import Optional, Any
 
@@ -69,6 +70,13 @@ class TextureUnitProxy(Integer32Proxy):
             setter=GL.glActiveTexture,
         )
 
+    def __get__(self, obj, cls):
+        # the binding state shadows the active unit
+        return binding_state().active_unit
+
+    def __set__(self, obj, value):
+        binding_state().active_unit = int(value)
+
     def _get_result(self, value):
         result = super(TextureUnitProxy, self)._get_result(value)
         return result - GL.GL_TEXTURE0
@@ -77,14 +85,42 @@ class TextureUnitProxy(Integer32Proxy):
         return [GL.GL_TEXTURE0 + value]
 
 class TextureProxy(Proxy):
-    def __init__(self, property, **kwargs):
+    """Texture parameter proxy.
+
+    When the context supports direct state access the named texture
+    functions are used and the texture is not bound.
+    Values are shadowed per texture, setting an unchanged value is a no-op.
+    """
+    def __init__(self, property, dsa_getter=None, dsa_setter=None, dsa_dtype=None, count=1, cache=True, **kwargs):
         super(TextureProxy, self).__init__(
             getter_args=[property],
             setter_args=[property],
             prepend_args=['_target'],
             bind=True,
+            cache=cache,
             **kwargs
         )
+        self._dsa_getter = dsa_getter
+        self._dsa_setter = dsa_setter
+        self._dsa_dtype = dsa_dtype
+        self._count = count
+
+    def _get(self, obj, cls):
+        if self._dsa_getter and direct_state_access():
+            # replace the target with the texture handle
+            args = self._get_args(obj, cls)
+            value = np.empty((self._count,), dtype=self._dsa_dtype)
+            self._dsa_getter(obj.handle, *(args[1:] + [value]))
+            return self._get_result(value)
+        return super(TextureProxy, self)._get(obj, cls)
+
+    def _set(self, obj, value):
+        if self._dsa_setter and direct_state_access():
+            data = np.array(value, dtype=self._dtype)
+            args = self._set_args(obj, data)
+            self._dsa_setter(obj.handle, *args[1:])
+            return
+        super(TextureProxy, self)._set(obj, value)
 
 class Integer32TextureProxy(TextureProxy):
     def __init__(self, property):
@@ -92,15 +128,22 @@ class Integer32TextureProxy(TextureProxy):
             property,
             getter=GL.glGetTexParameteriv,
             setter=GL.glTexParameteri,
+            dsa_getter=GL.glGetTextureParameteriv,
+            dsa_setter=GL.glTextureParameteri,
+            dsa_dtype=np.int32,
             dtype=np.int32,
         )
 
 class Float32TextureProxy(TextureProxy):
-    def __init__(self, property):
+    def __init__(self, property, count=1):
         super(Float32TextureProxy, self).__init__(
             property,
             getter=GL.glGetTexParameterfv,
-            setter=GL.glTexParameterf,
+            setter=GL.glTexParameterf if count == 1 else GL.glTexParameterfv,
+            dsa_getter=GL.glGetTextureParameterfv,
+            dsa_setter=GL.glTextureParameterf if count == 1 else GL.glTextureParameterfv,
+            dsa_dtype=np.float32,
+            count=count,
             dtype=np.float32,
         )
 
@@ -160,6 +203,10 @@ class SwizzleProxy(TextureProxy):
             GL.GL_TEXTURE_SWIZZLE_RGBA,
             getter=GL.glGetTexParameteriv,
             setter=GL.glTexParameteriv,
+            dsa_getter=GL.glGetTextureParameteriv,
+            dsa_setter=GL.glTextureParameteriv,
+            dsa_dtype=np.int32,
+            count=4,
             dtype=np.uint32,
         )
 
@@ -187,13 +234,15 @@ class Texture(DescriptorMixin, BindableObject, ManagedObject):
 
     _create_func = GL.glGenTextures
     _delete_func = GL.glDeleteTextures
+    _dsa_create_func = GL.glCreateTextures
     _bind_func = GL.glBindTexture
+    _pooled = True
 
-    max_units = Integer32Proxy(GL.GL_MAX_COMBINED_TEXTURE_IMAGE_UNITS)
+    max_units = Integer32Proxy(GL.GL_MAX_COMBINED_TEXTURE_IMAGE_UNITS, cache=True)
     active_unit = TextureUnitProxy()
 
-    max_size = Integer32Proxy(GL.GL_MAX_TEXTURE_SIZE)
-    max_array_length = Integer32Proxy(GL.GL_MAX_ARRAY_TEXTURE_LAYERS)
+    max_size = Integer32Proxy(GL.GL_MAX_TEXTURE_SIZE, cache=True)
+    max_array_length = Integer32Proxy(GL.GL_MAX_ARRAY_TEXTURE_LAYERS, cache=True)
 
     min_filter = Integer32TextureProxy(GL.GL_TEXTURE_MIN_FILTER)
     mag_filter = Integer32TextureProxy(GL.GL_TEXTURE_MAG_FILTER)
@@ -205,7 +254,7 @@ class Texture(DescriptorMixin, BindableObject, ManagedObject):
     mipmap_base_level = Integer32TextureProxy(GL.GL_TEXTURE_BASE_LEVEL)
     mipmap_max_level = Integer32TextureProxy(GL.GL_TEXTURE_MAX_LEVEL)
 
-    border_color = Float32TextureProxy(GL.GL_TEXTURE_BORDER_COLOR)
+    border_color = Float32TextureProxy(GL.GL_TEXTURE_BORDER_COLOR, count=4)
 
     compare_mode = Integer32TextureProxy(GL.GL_TEXTURE_COMPARE_MODE)
     compare_func = Integer32TextureProxy(GL.GL_TEXTURE_COMPARE_FUNC)
@@ -214,6 +263,10 @@ class Texture(DescriptorMixin, BindableObject, ManagedObject):
 
     swizzle = SwizzleProxy()
 
+    def _binding_key(self, state):
+        # textures are bound per texture unit
+        return (self._bind_func, self._target, state.active_unit)
+
     @classmethod
     def infer_internal_format(cls, shape, dtype, explicit=False):
         try:
@@ -428,20 +481,29 @@ class BasicTexture(Texture):
             data = self._image_to_np_array(image)
 
         format = format or self.infer_format(data.shape, data.dtype)
+        self._set_sub_image(data, data.shape, data.dtype, format, offset, level)
+
+    def _set_sub_image(self, pixels, shape, dtype, format, offset=None, level=0):
+        # pixels is an array, or an offset into the bound pixel unpack buffer
         offset = offset or [0 for _ in self.size]
-        data_type = dtypes.for_dtype(data.dtype)
+        data_type = dtypes.for_dtype(dtype)
 
         args = [self._target, level,]
-        args += offset + list(data.shape[:-1])
-        args += [format, data_type.gl_enum, data,]
-
-        with self:
-            self._sub_set(*args)
+        args += list(offset) + list(shape[:-1])
+        args += [format, data_type.gl_enum, pixels,]
 
+        if direct_state_access():
+            self._dsa_sub_set(self._handle, *args[1:])
+        else:
+            with self:
+                self._sub_set(*args)
 
     def mipmap(self):
-        with self:
-            GL.glGenerateMipmap(self._target)
+        if direct_state_access():
+            GL.glGenerateTextureMipmap(self._handle)
+        else:
+            with self:
+                GL.glGenerateMipmap(self._target)
 
     @property
     def internal_format(self):
@@ -472,6 +534,7 @@ class Texture1D_Mixin(object):
     _set = GL.glTexImage1D
     _immutable_set = GL.glTexStorage1D
     _sub_set = GL.glTexSubImage1D
+    _dsa_sub_set = GL.glTextureSubImage1D
 
     wrap_s = Integer32TextureProxy(GL.GL_TEXTURE_WRAP_S)
 
@@ -484,6 +547,7 @@ class Texture2D_Mixin(object):
     _set = GL.glTexImage2D
     _immutable_set = GL.glTexStorage2D
     _sub_set = GL.glTexSubImage2D
+    _dsa_sub_set = GL.glTextureSubImage2D
 
     wrap_s = Integer32TextureProxy(GL.GL_TEXTURE_WRAP_S)
     wrap_t = Integer32TextureProxy(GL.GL_TEXTURE_WRAP_T)
@@ -501,6 +565,7 @@ class Texture3D_Mixin(object):
     _set = GL.glTexImage3D
     _immutable_set = GL.glTexStorage3D
     _sub_set = GL.glTexSubImage3D
+    _dsa_sub_set = GL.glTextureSubImage3D
 
     wrap_s = Integer32TextureProxy(GL.GL_TEXTURE_WRAP_S)
     wrap_t = Integer32TextureProxy(GL.GL_TEXTURE_WRAP_T)
@@ -580,6 +645,7 @@ class FrameBufferTexture(DescriptorMixin, BindableObject, ManagedObject):
     _create_func = GL.glGenFramebuffers
     _delete_func = GL.glDeleteFramebuffers
     _bind_func = GL.glBindFramebuffer
+    _pooled = True
 
     def __init__(self, texture: Optional[Texture] = None, dimensions: tuple[int, int, Optional[int]] = None):
         if not texture and not dimensions: